@@ -0,0 +1,176 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+
+from fastapi import Depends, HTTPException, Request
+
+from app import metrics
+from app.config import Settings, get_settings
+
+
+class AdmissionController:
+    """Bound the summaries a process runs at once and the ones waiting.
+
+    ``reserve`` admits work against both bounds when it is submitted, and
+    ``run`` holds the submitted work until an in-flight slot frees up. Limits
+    are passed per call so that settings changes apply immediately.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.pending = 0
+        self._waiters: deque[tuple[int, int, asyncio.Future]] = deque()
+
+    def reserve(self, count: int, max_in_flight: int, max_pending: int) -> bool:
+        if self.in_flight + self.pending + count > max_in_flight + max_pending:
+            return False
+        self.pending += count
+        return True
+
+    def reserve_up_to(self, count: int, max_in_flight: int, max_pending: int) -> int:
+        """Reserve as many of ``count`` items as fit; return how many did."""
+        free = max_in_flight + max_pending - self.in_flight - self.pending
+        granted = max(0, min(count, free))
+        self.pending += granted
+        return granted
+
+    def release(self, count: int) -> None:
+        """Give back a reservation that will not be ``run``."""
+        self.pending -= count
+
+    async def run(self, count: int, max_in_flight: int, func, *args):
+        """Run ``func(*args)`` for ``count`` reserved items once slots free up.
+
+        A batch larger than ``max_in_flight`` waits for every slot and then
+        runs on its own.
+        """
+        slots = min(count, max_in_flight)
+        if self._waiters or self.in_flight + slots > max_in_flight:
+            entry = (slots, max_in_flight, asyncio.get_running_loop().create_future())
+            self._waiters.append(entry)
+            try:
+                await entry[2]
+            except asyncio.CancelledError:
+                if entry[2].cancelled():
+                    if entry in self._waiters:
+                        self._waiters.remove(entry)
+                    self._wake()
+                else:
+                    # Cancelled right after being handed the slots.
+                    self._finish(slots)
+                self.pending -= count
+                raise
+        else:
+            self.in_flight += slots
+
+        self.pending -= count
+        try:
+            return await func(*args)
+        finally:
+            self._finish(slots)
+
+    def _finish(self, slots: int) -> None:
+        self.in_flight -= slots
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters:
+            slots, max_in_flight, waiter = self._waiters[0]
+            if waiter.done():
+                self._waiters.popleft()
+                continue
+            if self.in_flight + slots > max_in_flight:
+                break
+            self._waiters.popleft()
+            self.in_flight += slots
+            waiter.set_result(None)
+
+
+class TokenBucketLimiter:
+    """Per-client token buckets, keeping at most ``max_clients`` of them."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def acquire(self, key: str, rate: float, burst: int, max_clients: int) -> float:
+        """Take a token; return 0, or the seconds until one is available."""
+        now = self.clock()
+        tokens, updated = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+def _state(request: Request, name: str, factory):
+    state = request.app.state
+    if not hasattr(state, name):
+        setattr(state, name, factory())
+    return getattr(state, name)
+
+
+def get_admission(request: Request) -> AdmissionController:
+    return _state(request, "admission", AdmissionController)
+
+
+def reject(status_code: int, detail: str, retry_after: float, reason: str):
+    metrics.admission_rejections.inc(reason=reason)
+    return HTTPException(
+        status_code=status_code,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def rate_limit(request: Request, settings: Settings = Depends(get_settings)) -> None:
+    if settings.rate_limit_per_second <= 0:
+        return
+    limiter = _state(request, "rate_limiter", TokenBucketLimiter)
+    client = request.client.host if request.client else "unknown"
+    wait = limiter.acquire(
+        client,
+        settings.rate_limit_per_second,
+        settings.rate_limit_burst,
+        settings.rate_limit_max_clients,
+    )
+    if wait:
+        raise reject(429, "Too many requests", wait, "rate_limited")
+
+
+CAPACITY_DETAIL = "Summarization is at capacity"
+
+
+def _at_capacity(settings: Settings) -> HTTPException:
+    return reject(503, CAPACITY_DETAIL, settings.admission_retry_after, "capacity")
+
+
+def reserve(admission: AdmissionController, settings: Settings, count: int) -> None:
+    """Admit ``count`` summaries to run in this process, or answer 503."""
+    if not admission.reserve(
+        count, settings.summary_max_in_flight, settings.summary_max_pending
+    ):
+        raise _at_capacity(settings)
+
+
+def reserve_up_to(
+    admission: AdmissionController, settings: Settings, count: int
+) -> int:
+    """Admit as many of ``count`` summaries as fit, or answer 503 if none do."""
+    granted = admission.reserve_up_to(
+        count, settings.summary_max_in_flight, settings.summary_max_pending
+    )
+    if count and not granted:
+        raise _at_capacity(settings)
+    if granted < count:
+        metrics.admission_rejections.inc(count - granted, reason="capacity")
+    return granted
@@ -0,0 +1,62 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request
+
+
+def _as_utc(value: datetime | str) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def row_etag(id: int, version: int, *extra) -> str:
+    return f'"{"-".join(str(value) for value in (id, version, *extra))}"'
+
+
+def page_etag(rows: list[dict], *extra) -> str:
+    digest = hashlib.sha1()
+    for row in rows:
+        digest.update(f"{row['id']}-{row['version']};".encode())
+    for value in extra:
+        digest.update(f"{value};".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def latest(values: list[datetime | str]) -> datetime | None:
+    return max((_as_utc(value) for value in values), default=None)
+
+
+def validator_headers(etag: str, last_modified: datetime | str | None) -> dict:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: datetime | str | None
+) -> bool:
+    """Evaluate If-None-Match, or failing that If-Modified-Since (RFC 9110)."""
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = (tag.strip() for tag in if_none_match.split(","))
+        return etag in (tag.removeprefix("W/") for tag in candidates)
+
+    if_modified_since = request.headers.get("If-Modified-Since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = _as_utc(parsedate_to_datetime(if_modified_since))
+    except (TypeError, ValueError):
+        return False
+    return _as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def has_conditions(request: Request) -> bool:
+    return "If-None-Match" in request.headers or "If-Modified-Since" in request.headers
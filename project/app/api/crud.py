@@ -1,38 +1,299 @@
+from datetime import datetime, timedelta
+
+from tortoise import BaseDBAsyncClient, connections, timezone
+from tortoise.backends.asyncpg import AsyncpgDBClient
+from tortoise.expressions import Q
+from tortoise.router import router
+
+from app.cache import get_summary_cache
+from app.config import get_settings
 from app.models.pydantic import SummaryPayloadSchema
-from app.models.tortoise import TextSummary
+from app.models.tortoise import SummaryStatus, TextSummary
+from app.urls import url_hash
+
+SUMMARY_FIELDS = ("id", "url", "summary", "status", "error", "created_at")
+VALIDATOR_FIELDS = ("version", "updated_at")
+_COLUMNS = ", ".join(f'"{field}"' for field in SUMMARY_FIELDS)
+
+
+def _parameter(connection, position: int) -> str:
+    if isinstance(connection, AsyncpgDBClient):
+        return f"${position + 1}"
+    return "?"
+
+
+def primary() -> BaseDBAsyncClient:
+    """The connection that takes writes, for reads that must see them."""
+    return connections.get("default")
 
 
-async def post(payload: SummaryPayloadSchema) -> int:
+def replica() -> BaseDBAsyncClient:
+    """The connection for reads that may lag behind writes."""
+    return router.db_for_read(TextSummary) or primary()
+
+
+async def post(
+    payload: SummaryPayloadSchema, connection: BaseDBAsyncClient | None = None
+) -> int:
     summary = TextSummary(
         url=payload.url,
         summary="",
+        url_hash=url_hash(payload.url),
     )
-    await summary.save()
+    await summary.save(using_db=connection)
     return summary.id
 
 
-async def get(id: int) -> dict | None:
-    summary = await TextSummary.filter(id=id).first().values()
+async def post_many(
+    urls: list[str], connection: BaseDBAsyncClient | None = None
+) -> list[int]:
+    """Insert one pending summary per url with a single INSERT ... RETURNING.
+
+    Returns the new ids in the order of ``urls``.
+    """
+    if not urls:
+        return []
+
+    connection = connection or primary()
+    rows, params = [], []
+    for url in urls:
+        placeholders = (_parameter(connection, len(params) + i) for i in range(4))
+        rows.append(f"({', '.join(placeholders)})")
+        params.extend((url, "", url_hash(url), SummaryStatus.PENDING.value))
+
+    inserted = await connection.execute_query_dict(
+        'INSERT INTO "textsummary" ("url", "summary", "url_hash", "status") '
+        f'VALUES {", ".join(rows)} RETURNING "id", "url_hash"',
+        params,
+    )
+    # RETURNING order is unspecified, so rows are matched back by url hash.
+    ids = {}
+    for row in sorted(inserted, key=lambda row: row["id"]):
+        ids.setdefault(row["url_hash"], []).append(row["id"])
+    return [ids[url_hash(url)].pop(0) for url in urls]
+
+
+async def _get(id: int, fields: tuple = SUMMARY_FIELDS) -> dict | None:
+    summary = await TextSummary.filter(id=id).first().values(*fields, *VALIDATOR_FIELDS)
     if summary:
         return summary
     return None
 
 
-async def get_all() -> list:
-    summaries = await TextSummary.all().values()
+async def get(id: int, fields: tuple = SUMMARY_FIELDS) -> dict | None:
+    """Return the summary's ``fields`` together with its ``VALIDATOR_FIELDS``.
+
+    Full rows go through the cache. A projection is cut from a cached row when
+    there is one, and otherwise reads only its own columns.
+    """
+    cache = get_summary_cache()
+    if fields == SUMMARY_FIELDS:
+        return await cache.get_or_load(id, _get)
+
+    cached = await cache.peek(id)
+    if cached is not None:
+        return {field: cached[field] for field in (*fields, *VALIDATOR_FIELDS)}
+    return await _get(id, fields)
+
+
+async def get_validators(id: int) -> dict | None:
+    """Return id, version and updated_at without reading the summary text."""
+    cached = await get_summary_cache().peek(id)
+    if cached is not None:
+        return {field: cached[field] for field in ("id", *VALIDATOR_FIELDS)}
+
+    validators = await TextSummary.filter(id=id).first().values("id", *VALIDATOR_FIELDS)
+    if validators:
+        return validators
+    return None
+
+
+async def get_status(id: int) -> str | None:
+    """Return the current status straight from the database, bypassing the cache."""
+    status = (
+        await TextSummary.filter(id=id)
+        .using_db(primary())
+        .first()
+        .values_list("status", flat=True)
+    )
+    if status is None:
+        return None
+    return SummaryStatus(status).value
+
+
+def _reusable() -> Q:
+    """Done summaries within the reuse window, or ones still being worked on.
+
+    A pending or running row counts as in flight only while it was touched
+    within the job visibility timeout; older ones were most likely abandoned.
+    """
+    settings = get_settings()
+    now = timezone.now()
+    in_flight_since = now - timedelta(seconds=settings.job_visibility_timeout)
+    return Q(created_at__gte=now - timedelta(seconds=settings.summary_reuse_window)) & (
+        Q(status=SummaryStatus.DONE)
+        | Q(
+            status__in=[SummaryStatus.PENDING, SummaryStatus.RUNNING],
+            updated_at__gte=in_flight_since,
+        )
+    )
+
+
+async def get_by_url(url: str) -> dict | None:
+    if get_settings().summary_reuse_window <= 0:
+        return None
+
+    summary = (
+        await TextSummary.filter(_reusable(), url_hash=url_hash(url))
+        .using_db(primary())
+        .order_by("-id")
+        .first()
+        .values(*SUMMARY_FIELDS)
+    )
+    if summary:
+        return summary
+    return None
+
+
+async def get_by_urls(urls: list[str]) -> dict[str, dict]:
+    """Map url hashes to the newest reusable summary, like ``get_by_url``."""
+    if get_settings().summary_reuse_window <= 0 or not urls:
+        return {}
+
+    summaries = (
+        await TextSummary.filter(
+            _reusable(), url_hash__in={url_hash(url) for url in urls}
+        )
+        .using_db(primary())
+        .order_by("id")
+        .values(*SUMMARY_FIELDS, "url_hash")
+    )
+    return {summary.pop("url_hash"): summary for summary in summaries}
+
+
+async def get_all(
+    limit: int | None = None,
+    after: int | None = None,
+    url: str | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    fields: tuple = SUMMARY_FIELDS,
+) -> list:
+    query = TextSummary.all().order_by("id")
+    if after is not None:
+        query = query.filter(id__gt=after)
+    if url is not None:
+        query = query.filter(url_hash=url_hash(url))
+    if created_after is not None:
+        query = query.filter(created_at__gte=created_after)
+    if created_before is not None:
+        query = query.filter(created_at__lt=created_before)
+    if limit is not None:
+        query = query.limit(limit)
+
+    summaries = await query.values(*fields)
     return summaries
 
 
-async def delete(id: int) -> int:
-    deleted_summary = await TextSummary.filter(id=id).first().delete()
-    return deleted_summary
+async def search(query: str, limit: int, offset: int = 0) -> list:
+    """Return summaries matching ``query``, best matches first.
+
+    On Postgres this uses the GIN-indexed ``search_vector`` column added by
+    migration 4; other backends fall back to substring matching in id order.
+    """
+    connection = replica()
+    if not isinstance(connection, AsyncpgDBClient):
+        condition = Q()
+        for term in query.split():
+            condition &= Q(url__icontains=term) | Q(summary__icontains=term)
+        return (
+            await TextSummary.filter(condition)
+            .order_by("id")
+            .offset(offset)
+            .limit(limit)
+            .values(*SUMMARY_FIELDS)
+        )
+
+    return await connection.execute_query_dict(
+        f"SELECT {_COLUMNS} "
+        'FROM "textsummary", websearch_to_tsquery(\'english\', $1) AS "query" '
+        'WHERE "search_vector" @@ "query" '
+        'ORDER BY ts_rank_cd("search_vector", "query") DESC, "id" '
+        "LIMIT $2 OFFSET $3",
+        [query, limit, offset],
+    )
+
+
+async def iter_all(
+    chunk_size: int,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+):
+    """Yield every summary in id order, ``chunk_size`` rows at a time.
+
+    On asyncpg the rows come from a server-side cursor, elsewhere from keyset
+    pages, so memory use does not depend on the size of the table.
+    """
+    connection = replica()
+    if not isinstance(connection, AsyncpgDBClient):
+        after = None
+        while True:
+            chunk = await get_all(
+                limit=chunk_size,
+                after=after,
+                created_after=created_after,
+                created_before=created_before,
+            )
+            if chunk:
+                yield chunk
+            if len(chunk) < chunk_size:
+                return
+            after = chunk[-1]["id"]
+
+    conditions, params = [], []
+    if created_after is not None:
+        params.append(created_after)
+        conditions.append(f'"created_at" >= ${len(params)}')
+    if created_before is not None:
+        params.append(created_before)
+        conditions.append(f'"created_at" < ${len(params)}')
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f'SELECT {_COLUMNS} FROM "textsummary" {where} ORDER BY "id"'
+
+    async with connection.acquire_connection() as raw_connection:
+        async with raw_connection.transaction():
+            cursor = await raw_connection.cursor(sql, *params)
+            while chunk := await cursor.fetch(chunk_size):
+                yield [dict(record) for record in chunk]
+
+
+async def delete(id: int) -> dict | None:
+    connection = primary()
+    deleted = await connection.execute_query_dict(
+        f'DELETE FROM "textsummary" WHERE "id" = {_parameter(connection, 0)} '
+        f"RETURNING {_COLUMNS}",
+        [id],
+    )
+    await get_summary_cache().invalidate(id)
+    if deleted:
+        return deleted[0]
+    return None
 
 
 async def put(id: int, payload: SummaryPayloadSchema) -> dict | None:
-    summary = await TextSummary.filter(id=id).update(
-        url=payload.url, summary=payload.summary
+    connection = primary()
+    url, summary, url_digest = payload.url, payload.summary, url_hash(payload.url)
+    updated = await connection.execute_query_dict(
+        'UPDATE "textsummary" SET '
+        f'"url" = {_parameter(connection, 0)}, '
+        f'"summary" = {_parameter(connection, 1)}, '
+        f'"url_hash" = {_parameter(connection, 2)}, '
+        f'"status" = {_parameter(connection, 3)}, "error" = NULL, '
+        '"version" = "version" + 1, "updated_at" = CURRENT_TIMESTAMP '
+        f'WHERE "id" = {_parameter(connection, 4)} RETURNING {_COLUMNS}',
+        [url, summary, url_digest, SummaryStatus.DONE.value, id],
     )
-    if summary:
-        updated_summary = await TextSummary.filter(id=id).first().values()
-        return updated_summary
+    await get_summary_cache().invalidate(id)
+    if updated:
+        return updated[0]
     return None
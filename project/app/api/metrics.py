@@ -0,0 +1,44 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from tortoise import Tortoise, connections
+from tortoise.backends.asyncpg import AsyncpgDBClient
+
+from app import jobs, metrics
+from app.config import get_settings
+
+router = APIRouter()
+
+
+async def collect_job_queue_depth() -> None:
+    if Tortoise._inited and get_settings().summary_queue == "database":
+        metrics.job_queue_depth.set(await jobs.depth())
+
+
+async def collect_db_pools() -> None:
+    if not Tortoise._inited:
+        return
+    for name in connections.db_config:
+        client = connections.get(name)
+        pool = getattr(client, "_pool", None)
+        if not isinstance(client, AsyncpgDBClient) or pool is None:
+            continue
+        idle = pool.get_idle_size()
+        metrics.db_pool_connections.set(idle, connection=name, state="idle")
+        metrics.db_pool_connections.set(
+            pool.get_size() - idle, connection=name, state="in_use"
+        )
+        metrics.db_pool_connections.set(
+            pool.get_max_size(), connection=name, state="max"
+        )
+
+
+metrics.REGISTRY.add_collector(collect_job_queue_depth)
+metrics.REGISTRY.add_collector(collect_db_pools)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        await metrics.REGISTRY.collect(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
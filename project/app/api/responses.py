@@ -0,0 +1,15 @@
+from fastapi.responses import ORJSONResponse
+
+from app.config import Settings
+
+
+class TrustedJSONResponse(ORJSONResponse):
+    """Serialize rows from ``.values()`` as-is, skipping response_model validation.
+
+    Only return content that already matches the route's response model, or
+    a ``?fields=`` projection of it.
+    """
+
+
+def fast_json_enabled(settings: Settings, route: str) -> bool:
+    return route in settings.fast_json_routes
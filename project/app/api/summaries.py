@@ -1,26 +1,107 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Path
+import asyncio
+import base64
+import binascii
+import json
+import zlib
+from datetime import datetime
+from typing import Any
 
-from app.api import crud
-from app.models.tortoise import SummarySchema
-from app.summarizer import generate_summary
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from tortoise.transactions import in_transaction
 
+from app import jobs
+from app.api import conditional, crud
+from app.api.responses import TrustedJSONResponse, fast_json_enabled
+from app.cache import get_summary_cache
+from app.config import Settings, get_settings
+from app.models.tortoise import SummarySchema, SummaryStatus
+from app.notifications import notifier
+from app.summarizer import generate_summaries, generate_summary
+from app.urls import url_hash
+
+from app.api.admission import (  # isort: skip
+    AdmissionController,
+    get_admission,
+    CAPACITY_DETAIL,
+    rate_limit,
+    reserve,
+    reserve_up_to,
+)
+from fastapi import (  # isort: skip
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Body,
+    Path,
+    Query,
+    Request,
+    Response,
+)
 from app.models.pydantic import (  # isort: skip
+    SummaryBatchResponseSchema,
+    SummaryPageSchema,
     SummaryPayloadSchema,
     SummaryResponseSchema,
+    SummarySearchPageSchema,
     SummaryUpdatePayloadSchema,
 )
 
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 100
+FINAL_STATUSES = {SummaryStatus.DONE.value, SummaryStatus.FAILED.value}
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
 
-@router.post("/", response_model=SummaryResponseSchema, status_code=201)
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+
+
+@router.post(
+    "/",
+    response_model=SummaryResponseSchema,
+    status_code=201,
+    dependencies=[Depends(rate_limit)],
+)
 async def create_summary(
-    payload: SummaryPayloadSchema, background_task: BackgroundTasks
+    payload: SummaryPayloadSchema,
+    background_task: BackgroundTasks,
+    settings: Settings = Depends(get_settings),
+    admission: AdmissionController = Depends(get_admission),
 ) -> int:
-    summary_id = await crud.post(payload)
+    # A fresh or in-flight summary of the same canonical URL is reused as-is.
+    existing = await crud.get_by_url(payload.url)
+    if existing:
+        return {"id": existing["id"], "url": existing["url"]}
 
-    background_task.add_task(generate_summary, summary_id, payload.url)
+    if settings.summary_queue == "database":
+        async with in_transaction("default") as connection:
+            summary_id = await crud.post(payload, connection)
+            await jobs.enqueue(summary_id, payload.url, connection)
+    else:
+        reserve(admission, settings, 1)
+        try:
+            summary_id = await crud.post(payload)
+        except Exception:
+            admission.release(1)
+            raise
+        background_task.add_task(
+            admission.run,
+            1,
+            settings.summary_max_in_flight,
+            generate_summary,
+            summary_id,
+            payload.url,
+        )
 
     response_object = {
         "id": summary_id,
@@ -29,28 +110,288 @@ async def create_summary(
     return response_object
 
 
+@router.post(
+    "/batch",
+    response_model=SummaryBatchResponseSchema,
+    dependencies=[Depends(rate_limit)],
+)
+async def create_summaries(
+    background_task: BackgroundTasks,
+    payload: list[Any] = Body(...),
+    settings: Settings = Depends(get_settings),
+    admission: AdmissionController = Depends(get_admission),
+) -> SummaryBatchResponseSchema:
+    if len(payload) > settings.max_batch_size:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch exceeds {settings.max_batch_size} items",
+        )
+
+    results, valid = [], []
+    for index, item in enumerate(payload):
+        try:
+            url = SummaryPayloadSchema.parse_obj(item).url
+        except ValidationError as exc:
+            results.append({"index": index, "errors": exc.errors()})
+        else:
+            results.append({"index": index, "url": url})
+            valid.append(results[-1])
+
+    existing = await crud.get_by_urls([result["url"] for result in valid])
+    pending = {}
+    for result in valid:
+        key = url_hash(result["url"])
+        if key in existing:
+            result["id"] = existing[key]["id"]
+        else:
+            pending.setdefault(key, []).append(result)
+
+    if settings.summary_queue != "database":
+        # Items beyond the free capacity are rejected one by one.
+        granted = reserve_up_to(admission, settings, len(pending))
+        for key in list(pending)[granted:]:
+            for result in pending.pop(key):
+                result["errors"] = [{"msg": CAPACITY_DETAIL, "type": "capacity"}]
+
+    new_urls = [duplicates[0]["url"] for duplicates in pending.values()]
+    if settings.summary_queue == "database":
+        # Rows and their jobs commit together, so no row is left without a job.
+        async with in_transaction("default") as connection:
+            new_ids = await crud.post_many(new_urls, connection)
+            if new_ids:
+                await jobs.enqueue_many(list(zip(new_ids, new_urls)), connection)
+    else:
+        try:
+            new_ids = await crud.post_many(new_urls)
+        except Exception:
+            admission.release(len(pending))
+            raise
+        if new_ids:
+            background_task.add_task(
+                admission.run,
+                len(new_ids),
+                settings.summary_max_in_flight,
+                generate_summaries,
+                list(zip(new_ids, new_urls)),
+                settings.summary_max_in_flight,
+            )
+    for summary_id, duplicates in zip(new_ids, pending.values()):
+        for result in duplicates:
+            result["id"] = summary_id
+
+    return {"items": results}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+@router.get("/export")
+async def export_summaries(
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    gzip: bool = False,
+    settings: Settings = Depends(get_settings),
+) -> StreamingResponse:
+    async def ndjson_lines():
+        compressor = zlib.compressobj(wbits=31) if gzip else None
+        async for chunk in crud.iter_all(
+            settings.export_chunk_size,
+            created_after=created_after,
+            created_before=created_before,
+        ):
+            data = "".join(
+                json.dumps(row, default=_json_default) + "\n" for row in chunk
+            ).encode()
+            yield compressor.compress(data) if compressor else data
+        if compressor:
+            yield compressor.flush()
+
+    headers = {"Content-Encoding": "gzip"} if gzip else None
+    return StreamingResponse(
+        ndjson_lines(), media_type="application/x-ndjson", headers=headers
+    )
+
+
+@router.get("/search", response_model=SummarySearchPageSchema)
+async def search_summaries(
+    q: str = Query(..., min_length=1, max_length=256),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+) -> SummarySearchPageSchema:
+    results = await crud.search(q, limit=limit + 1, offset=offset)
+
+    next_offset = None
+    if len(results) > limit:
+        results = results[:limit]
+        next_offset = offset + limit
+
+    return {"items": results, "next_offset": next_offset}
+
+
+@router.get("/cache/stats")
+async def read_cache_stats() -> dict:
+    return get_summary_cache().stats()
+
+
+def summary_fields(
+    fields: str | None = Query(None, description="Comma-separated fields to return")
+) -> tuple | None:
+    """Parse ``?fields=`` into a projection of ``crud.SUMMARY_FIELDS``.
+
+    The id is always included. None means every field.
+    """
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    if unknown := requested - set(crud.SUMMARY_FIELDS):
+        raise HTTPException(
+            status_code=422, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    projection = tuple(
+        field for field in crud.SUMMARY_FIELDS if field == "id" or field in requested
+    )
+    return None if projection == crud.SUMMARY_FIELDS else projection
+
+
+def _pop_validators(row: dict) -> tuple[int, object] | None:
+    if "version" not in row:
+        return None
+    return row.pop("version"), row.pop("updated_at")
+
+
 @router.get("/{id}/", response_model=SummarySchema)
-async def read_summary(id: int = Path(..., gt=0)) -> SummarySchema:
-    summary = await crud.get(id)
+async def read_summary(
+    request: Request,
+    response: Response,
+    id: int = Path(..., gt=0),
+    projection: tuple | None = Depends(summary_fields),
+    settings: Settings = Depends(get_settings),
+) -> SummarySchema:
+    variant = projection or ()
+    if conditional.has_conditions(request):
+        # Answer revalidation from id/version/updated_at alone.
+        validators = await crud.get_validators(id)
+        if not validators:
+            raise HTTPException(status_code=404, detail="Summary not found")
+        etag = conditional.row_etag(id, validators["version"], *variant)
+        if conditional.is_not_modified(request, etag, validators["updated_at"]):
+            return Response(
+                status_code=304,
+                headers=conditional.validator_headers(etag, validators["updated_at"]),
+            )
+
+    summary = await crud.get(id, projection or crud.SUMMARY_FIELDS)
     if not summary:
         raise HTTPException(status_code=404, detail="Summary not found")
 
+    headers = {}
+    if validators := _pop_validators(summary):
+        version, updated_at = validators
+        headers = conditional.validator_headers(
+            conditional.row_etag(id, version, *variant), updated_at
+        )
+
+    # A projection does not match the response model, so it skips validation.
+    if projection or fast_json_enabled(settings, "read_summary"):
+        return TrustedJSONResponse(summary, headers=headers)
+    response.headers.update(headers)
     return summary
 
 
-@router.get("/", response_model=list[SummarySchema])
-async def read_all_summaries() -> list[SummarySchema]:
-    summaries_list = await crud.get_all()
+def _status_event(id: int, status: str) -> str:
+    return f"event: status\ndata: {json.dumps({'id': id, 'status': status})}\n\n"
+
+
+@router.get("/{id}/events")
+async def stream_summary_events(
+    id: int = Path(..., gt=0),
+    settings: Settings = Depends(get_settings),
+) -> StreamingResponse:
+    # Subscribe before reading the status so a completion in between is not lost.
+    waiter = notifier.subscribe(id)
+    status = await crud.get_status(id)
+    if status is None:
+        notifier.unsubscribe(id, waiter)
+        raise HTTPException(status_code=404, detail="Summary not found")
+
+    async def events():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.sse_timeout
+        try:
+            yield _status_event(id, status)
+            if status in FINAL_STATUSES:
+                return
+            while (remaining := deadline - loop.time()) > 0:
+                timeout = min(settings.sse_heartbeat, remaining)
+                if final_status := await notifier.wait(id, waiter, timeout):
+                    yield _status_event(id, final_status)
+                    return
+                yield ": heartbeat\n\n"
+        finally:
+            notifier.unsubscribe(id, waiter)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/", response_model=SummaryPageSchema)
+async def read_all_summaries(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    url: str | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    projection: tuple | None = Depends(summary_fields),
+    settings: Settings = Depends(get_settings),
+) -> SummaryPageSchema:
+    after = decode_cursor(cursor) if cursor else None
+    # Fetch one extra row to know whether another page follows.
+    summaries_list = await crud.get_all(
+        limit=limit + 1,
+        after=after,
+        url=url,
+        created_after=created_after,
+        created_before=created_before,
+        fields=(projection or crud.SUMMARY_FIELDS) + crud.VALIDATOR_FIELDS,
+    )
+
+    next_cursor = None
+    if len(summaries_list) > limit:
+        summaries_list = summaries_list[:limit]
+        next_cursor = encode_cursor(summaries_list[-1]["id"])
+
+    headers = {}
+    if all("version" in row for row in summaries_list):
+        etag = conditional.page_etag(summaries_list, next_cursor, *(projection or ()))
+        last_modified = conditional.latest(
+            [row["updated_at"] for row in summaries_list]
+        )
+        headers = conditional.validator_headers(etag, last_modified)
+        if conditional.is_not_modified(request, etag, last_modified):
+            return Response(status_code=304, headers=headers)
+        for row in summaries_list:
+            _pop_validators(row)
 
-    return summaries_list
+    page = {"items": summaries_list, "next_cursor": next_cursor}
+    if projection or fast_json_enabled(settings, "read_all_summaries"):
+        return TrustedJSONResponse(page, headers=headers)
+    response.headers.update(headers)
+    return page
 
 
 @router.delete("/{id}/", response_model=SummaryResponseSchema)
 async def delete_summary(id: int = Path(..., gt=0)) -> SummaryResponseSchema:
-    summary = await crud.get(id)
+    summary = await crud.delete(id)
     if not summary:
         raise HTTPException(status_code=404, detail="Summary not found")
-    await crud.delete(id)
 
     return summary
 
@@ -0,0 +1,151 @@
+import gzip
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.config import get_settings
+
+
+@dataclass
+class CachedArticle:
+    html: str
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ArticleCache:
+    """Gzipped article HTML on local disk, evicted least recently used first.
+
+    Each entry is a ``<key>.html.gz`` body next to a ``<key>.json`` file with
+    the validators to revalidate it. Recency is the body's mtime, which a hit
+    refreshes. Writes go through a temporary file and ``os.replace``, so
+    several processes can share one directory. The methods block, so call
+    them from a thread.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size: int | None = None
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self.directory / f"{key}.html.gz", self.directory / f"{key}.json"
+
+    def get(self, key: str) -> CachedArticle | None:
+        body_path, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+            html = gzip.decompress(body_path.read_bytes()).decode()
+            os.utime(body_path)
+        except (OSError, ValueError, EOFError):
+            return None
+        return CachedArticle(html, meta.get("etag"), meta.get("last_modified"))
+
+    def put(self, key: str, article: CachedArticle) -> None:
+        body_path, meta_path = self._paths(key)
+        body = gzip.compress(article.html.encode(), compresslevel=6)
+        meta = json.dumps(
+            {"etag": article.etag, "last_modified": article.last_modified}
+        ).encode()
+        if len(body) + len(meta) > self.max_bytes:
+            return
+
+        with self._lock:
+            replaced = self._entry_size(key)
+            # Metadata goes last, so a reader never pairs it with an old body.
+            self._write(body_path, body)
+            self._write(meta_path, meta)
+            if self._size is not None:
+                self._size += len(body) + len(meta) - replaced
+            if self._current_size() > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            for path in self._paths(key):
+                path.unlink(missing_ok=True)
+            self._size = None
+
+    def _write(self, path: Path, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _entry_size(self, key: str) -> int:
+        size = 0
+        for path in self._paths(key):
+            try:
+                size += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return size
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        entries = []
+        for path in self.directory.glob("*.html.gz"):
+            key = path.name.removesuffix(".html.gz")
+            try:
+                mtime = path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            entries.append((mtime, self._entry_size(key), key))
+        return entries
+
+    def _current_size(self) -> int:
+        # Other processes may write too; the running total is rebuilt on eviction.
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        return self._size
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, key in entries:
+            if total <= target:
+                break
+            for path in self._paths(key):
+                path.unlink(missing_ok=True)
+            total -= size
+        self._size = total
+
+
+_article_cache: ArticleCache | None = None
+
+
+def get_article_cache() -> ArticleCache | None:
+    """Return the shared cache, or None when ``article_cache_dir`` is unset."""
+    global _article_cache
+
+    settings = get_settings()
+    if not settings.article_cache_dir:
+        return None
+    if _article_cache is None:
+        _article_cache = ArticleCache(
+            settings.article_cache_dir, settings.article_cache_max_bytes
+        )
+    return _article_cache
+
+
+def reset_article_cache() -> None:
+    global _article_cache
+
+    _article_cache = None
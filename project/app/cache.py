@@ -0,0 +1,113 @@
+import time
+from collections import OrderedDict
+
+from app import metrics
+from app.config import get_settings
+
+
+class CacheBackend:
+    """Storage used by ``SummaryCache``.
+
+    The local backend below serves a single process; a shared backend (e.g.
+    Redis or memcached) only has to implement these three coroutines.
+    """
+
+    async def get(self, key: str) -> dict | None:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: dict, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class LocalCache(CacheBackend):
+    def __init__(self, maxsize: int, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.clock = clock
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: dict, ttl: float) -> None:
+        self._entries[key] = (self.clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+
+class SummaryCache:
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(id: int) -> str:
+        return f"summary:{id}"
+
+    async def get_or_load(self, id: int, loader) -> dict | None:
+        if self.ttl <= 0:
+            return await loader(id)
+
+        value = await self.backend.get(self.key(id))
+        if value is not None:
+            self.hits += 1
+            metrics.summary_cache_requests.inc(result="hit")
+            return dict(value)
+
+        self.misses += 1
+        metrics.summary_cache_requests.inc(result="miss")
+        value = await loader(id)
+        if value is not None:
+            await self.backend.set(self.key(id), dict(value), self.ttl)
+        return value
+
+    async def peek(self, id: int) -> dict | None:
+        """Return the cached value without loading it or counting a lookup."""
+        if self.ttl <= 0:
+            return None
+        return await self.backend.get(self.key(id))
+
+    async def invalidate(self, id: int) -> None:
+        await self.backend.delete(self.key(id))
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_summary_cache: SummaryCache | None = None
+
+
+def get_summary_cache() -> SummaryCache:
+    global _summary_cache
+
+    if _summary_cache is None:
+        settings = get_settings()
+        _summary_cache = SummaryCache(
+            LocalCache(settings.summary_cache_size), settings.summary_cache_ttl
+        )
+    return _summary_cache
+
+
+def set_summary_cache_backend(backend: CacheBackend) -> None:
+    global _summary_cache
+
+    _summary_cache = SummaryCache(backend, get_settings().summary_cache_ttl)
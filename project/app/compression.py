@@ -0,0 +1,140 @@
+import zlib
+
+from app.config import get_settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available.
+    brotli = None
+
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+
+def _header(headers: list, name: bytes) -> bytes | None:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def choose_encoding(accept_encoding: str, encodings: list[str]) -> str | None:
+    """Pick the first of ``encodings`` the client accepts (RFC 9110 12.5.3)."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = quality
+
+    for encoding in encodings:
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str, settings):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(
+                quality=settings.compression_brotli_quality
+            )
+        else:
+            self._zlib = zlib.compressobj(settings.compression_gzip_level, wbits=31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            data = self._brotli.process(data)
+            return data + self._brotli.finish() if final else data
+        data = self._zlib.compress(data)
+        return data + self._zlib.flush() if final else data
+
+
+class CompressionMiddleware:
+    """Compress responses with the best encoding the client accepts.
+
+    Encodings are tried in ``compression_encodings`` order. Bodies known to be
+    smaller than ``compression_minimum_size``, responses that already carry a
+    Content-Encoding and event streams are sent as they are.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        settings = get_settings()
+        if scope["type"] != "http" or not settings.compression_encodings:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = _header(scope.get("headers", []), b"accept-encoding")
+        encoding = choose_encoding(
+            (accept_encoding or b"").decode("latin-1"), settings.compression_encodings
+        )
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                content_type = (_header(headers, b"content-type") or b"").decode(
+                    "latin-1"
+                )
+                if (
+                    _header(headers, b"content-encoding") is not None
+                    or content_type.startswith(UNCOMPRESSED_TYPES)
+                    or message["status"] in (204, 304)
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                headers.append((b"vary", b"Accept-Encoding"))
+                start = {**message, "headers": headers}
+                if encoding is None:
+                    passthrough = True
+                    await send(start)
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < settings.compression_minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, settings)
+                headers = [
+                    (key, value)
+                    for key, value in start["headers"]
+                    if key.lower() != b"content-length"
+                ]
+                headers.append((b"content-encoding", encoding.encode()))
+                body = compressor.compress(body, final=not more_body)
+                if not more_body:
+                    headers.append((b"content-length", str(len(body)).encode()))
+                await send({**start, "headers": headers})
+            else:
+                body = compressor.compress(body, final=not more_body)
+
+            await send(
+                {"type": "http.response.body", "body": body, "more_body": more_body}
+            )
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,7 +1,7 @@
 import logging
 from functools import lru_cache
 
-from pydantic import AnyUrl, BaseSettings
+from pydantic import AnyUrl, BaseSettings, root_validator
 
 log = logging.getLogger("uvicorn")
 
@@ -10,6 +10,65 @@ class Settings(BaseSettings):
     environment: str = "dev"
     testing: bool = 0
     databese_url: AnyUrl = None
+    database_replica_url: str | None = None
+    database_pool_options: dict[str, dict[str, int]] = {}
+    summarizer_executor: str = "process"
+    summarizer_workers: int = 2
+    summarizer_warmup: bool = True
+    summarizer_engine: str = "newspaper"
+    summarizer_batch_size: int = 50
+    summary_queue: str = "background"
+    worker_concurrency: int = 4
+    job_max_attempts: int = 3
+    job_visibility_timeout: int = 300
+    job_retry_delay: int = 30
+    job_poll_interval: float = 1.0
+    summary_max_in_flight: int = 16
+    summary_max_pending: int = 256
+    admission_retry_after: int = 5
+    rate_limit_per_second: float = 0.0
+    rate_limit_burst: int = 10
+    rate_limit_max_clients: int = 10000
+    summary_write_window: float = 0.05
+    summary_write_max_items: int = 100
+    summary_reuse_window: int = 86400
+    summary_cache_size: int = 10000
+    summary_cache_ttl: float = 5.0
+    export_chunk_size: int = 1000
+    max_batch_size: int = 1000
+    fast_json_routes: set[str] = set()
+    compression_encodings: list[str] = ["br", "gzip"]
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    fetch_timeout: float = 10.0
+    fetch_max_bytes: int = 5_000_000
+    fetch_max_connections: int = 100
+    fetch_max_keepalive_connections: int = 20
+    fetch_per_host_limit: int = 4
+    article_cache_dir: str = ""
+    article_cache_max_bytes: int = 256 * 1024 * 1024
+    notify_backend: str = "local"
+    sse_heartbeat: float = 15.0
+    sse_timeout: float = 300.0
+    partition_premake_months: int = 3
+    partition_retention_months: int = 0
+    partition_archive_dir: str = ""
+    profile_dir: str = ""
+    profile_max_files: int = 100
+    profile_token: str = ""
+    profile_sample_rate: float = 0.0
+
+    @root_validator(skip_on_failure=True)
+    def check_notify_backend(cls, values):
+        # Database jobs finish in worker processes, so the API only hears of
+        # them through Postgres NOTIFY.
+        if (
+            values["summary_queue"] == "database"
+            and values["notify_backend"] != "postgres"
+        ):
+            raise ValueError("summary_queue=database requires notify_backend=postgres")
+        return values
 
 
 @lru_cache()
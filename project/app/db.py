@@ -1,32 +1,92 @@
 import logging
 import os
 
-from fastapi import FastAPI
-from tortoise import Tortoise, run_async
-from tortoise.contrib.fastapi import register_tortoise
+from tortoise import BaseDBAsyncClient, Model, Tortoise, run_async
+from tortoise.backends.asyncpg import AsyncpgDBClient
+from tortoise.backends.base.config_generator import expand_db_url
+
+from app.config import get_settings
+from app.models.tortoise import TextSummary
 
 log = logging.getLogger("uvicorn")
 
 
-TORTOISE_ORM = {
-    "connections": {"default": os.environ.get("DATABASE_URL")},
-    "apps": {
-        "models": {
-            "models": ["app.models.tortoise", "aerich.models"],
-            "default_connection": "default",
+DATABASE_URL = os.environ.get("DATABASE_URL")
+ASYNCPG_ENGINE = "tortoise.backends.asyncpg"
+
+
+class ReplicaRouter:
+    """Send summary reads to the ``replica`` connection, everything else to
+    ``default``. Reads that must see a write just made use ``crud.primary``.
+    """
+
+    def db_for_read(self, model: type[Model]) -> str | None:
+        if model is TextSummary:
+            return "replica"
+        return None
+
+    def db_for_write(self, model: type[Model]) -> str:
+        return "default"
+
+
+def _connection(url: str | None, name: str) -> str | dict | None:
+    pool_options = get_settings().database_pool_options.get(name)
+    if url is None or not pool_options:
+        return url
+    config = expand_db_url(url)
+    if config["engine"] == ASYNCPG_ENGINE:
+        config["credentials"].update(pool_options)
+    return config
+
+
+def get_tortoise_config(
+    url: str | None = DATABASE_URL, replica_url: str | None = None
+) -> dict:
+    replica_url = replica_url or get_settings().database_replica_url
+    config = {
+        "connections": {"default": _connection(url, "default")},
+        "apps": {
+            "models": {
+                "models": ["app.models.tortoise", "aerich.models"],
+                "default_connection": "default",
+            },
         },
-    },
-}
+    }
+    if replica_url:
+        config["connections"]["replica"] = _connection(replica_url, "replica")
+        config["routers"] = [ReplicaRouter]
+    return config
 
 
-def init_db(app: FastAPI) -> None:
-    register_tortoise(
-        app,
-        db_url=os.environ.get("DATABASE_URL"),
-        modules={"modules": ["app.models.tortoise"]},
-        generate_schemas=False,
-        add_exception_handlers=True,
+TORTOISE_ORM = get_tortoise_config()
+
+
+async def init_db() -> None:
+    log.info("Initializing Tortoise...")
+    await Tortoise.init(config=TORTOISE_ORM)
+
+
+async def close_db() -> None:
+    await Tortoise.close_connections()
+
+
+# The full-text column of migration 4, which the model does not declare.
+SEARCH_VECTOR_SQL = """
+ALTER TABLE "textsummary" ADD COLUMN IF NOT EXISTS "search_vector" TSVECTOR
+GENERATED ALWAYS AS (
+    to_tsvector(
+        'english',
+        regexp_replace("url", '[^[:alnum:]]+', ' ', 'g') || ' ' || "summary"
     )
+) STORED;
+CREATE INDEX IF NOT EXISTS "idx_textsummary_search_vector"
+ON "textsummary" USING GIN ("search_vector");"""
+
+
+async def add_search_vector(connection: BaseDBAsyncClient) -> None:
+    """Add ``search_vector`` to a Postgres schema made by ``generate_schemas``."""
+    if isinstance(connection, AsyncpgDBClient):
+        await connection.execute_script(SEARCH_VECTOR_SQL)
 
 
 async def generate_schema() -> None:
@@ -38,6 +98,7 @@ async def generate_schema() -> None:
     )
     log.info("Generating database schema via Tortoise...")
     await Tortoise.generate_schemas()
+    await add_search_vector(Tortoise.get_connection("default"))
     await Tortoise.close_connections()
 
 
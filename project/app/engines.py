@@ -0,0 +1,121 @@
+from newspaper import nlp
+
+MAX_SENTENCES = 5
+
+
+class SummarizerEngine:
+    """Pick the summary sentences of an already extracted article.
+
+    Engines run inside the summarizer executor, so they must be cheap to
+    construct in a fresh process and must not touch the event loop.
+    """
+
+    name = ""
+
+    def summarize(self, title: str, text: str) -> str:
+        raise NotImplementedError
+
+    def summarize_many(self, articles: list[tuple[str, str]]) -> list[str]:
+        return [self.summarize(title, text) for title, text in articles]
+
+
+class NewspaperEngine(SummarizerEngine):
+    """The keyword scoring behind newspaper's ``Article.nlp()``."""
+
+    name = "newspaper"
+
+    def summarize(self, title: str, text: str) -> str:
+        nlp.load_stopwords("en")
+        sentences = nlp.summarize(title=title, text=text, max_sents=MAX_SENTENCES)
+        return "\n".join(sentences)
+
+
+class TextRankEngine(SummarizerEngine):
+    """TextRank over TF-IDF sentence vectors, computed with NumPy.
+
+    Sentences are ranked by PageRank on their cosine-similarity graph. The
+    random jumps favour sentences close to the title and early in the
+    article, which is where news copy puts its key facts.
+    """
+
+    name = "textrank"
+    damping = 0.85
+    iterations = 100
+    tolerance = 1e-6
+
+    def __init__(self):
+        try:
+            import numpy
+        except ImportError as exc:
+            raise RuntimeError("The textrank summarizer engine requires numpy") from exc
+        self.np = numpy
+        nlp.load_stopwords("en")
+
+    @staticmethod
+    def _terms(text: str) -> list[str]:
+        return [word for word in nlp.split_words(text) if word not in nlp.stopwords]
+
+    def summarize(self, title: str, text: str) -> str:
+        np = self.np
+        sentences = nlp.split_sentences(text)
+        if len(sentences) <= MAX_SENTENCES:
+            return "\n".join(sentences)
+
+        vocabulary: dict[str, int] = {}
+        rows, columns = [], []
+        for row, sentence in enumerate(sentences):
+            for term in self._terms(sentence):
+                rows.append(row)
+                columns.append(vocabulary.setdefault(term, len(vocabulary)))
+
+        size = len(sentences)
+        counts = np.zeros((size, len(vocabulary)))
+        np.add.at(counts, (rows, columns), 1)
+
+        tf = counts / np.maximum(counts.sum(axis=1, keepdims=True), 1)
+        idf = np.log((1 + size) / (1 + np.count_nonzero(counts, axis=0))) + 1
+        vectors = tf * idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+
+        similarity = vectors @ vectors.T
+        np.fill_diagonal(similarity, 0)
+        degree = similarity.sum(axis=1, keepdims=True)
+        # Sentences sharing no terms with the rest jump anywhere uniformly.
+        transition = np.divide(
+            similarity,
+            degree,
+            out=np.full_like(similarity, 1 / size),
+            where=degree > 0,
+        )
+
+        title_vector = np.zeros(len(vocabulary))
+        for term in self._terms(title):
+            if term in vocabulary:
+                title_vector[vocabulary[term]] = 1
+        jump = vectors @ title_vector + 1 / np.sqrt(np.arange(1, size + 1))
+        jump /= jump.sum()
+
+        scores = np.full(size, 1 / size)
+        for _ in range(self.iterations):
+            updated = (1 - self.damping) * jump + self.damping * (transition.T @ scores)
+            converged = np.abs(updated - scores).sum() < self.tolerance
+            scores = updated
+            if converged:
+                break
+
+        best = np.sort(np.argsort(-scores, kind="stable")[:MAX_SENTENCES])
+        return "\n".join(sentences[index] for index in best)
+
+
+ENGINES = {engine.name: engine for engine in (NewspaperEngine, TextRankEngine)}
+
+_engines: dict[str, SummarizerEngine] = {}
+
+
+def get_engine(name: str) -> SummarizerEngine:
+    if name not in ENGINES:
+        raise ValueError(f"Unknown summarizer engine: {name!r}")
+    if name not in _engines:
+        _engines[name] = ENGINES[name]()
+    return _engines[name]
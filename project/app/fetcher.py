@@ -0,0 +1,103 @@
+import asyncio
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from app import metrics
+from app.article_cache import CachedArticle, get_article_cache
+from app.config import get_settings
+from app.urls import url_hash
+
+if TYPE_CHECKING:
+    import httpx
+
+USER_AGENT = "fastapi-tdd-summarizer/1.0"
+
+_client: "httpx.AsyncClient | None" = None
+_host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+class FetchError(Exception):
+    pass
+
+
+def init_client(transport: "httpx.AsyncBaseTransport | None" = None) -> None:
+    global _client
+
+    # Imported here so that only processes that fetch pay for httpx.
+    import httpx
+
+    settings = get_settings()
+    _client = httpx.AsyncClient(
+        timeout=settings.fetch_timeout,
+        limits=httpx.Limits(
+            max_connections=settings.fetch_max_connections,
+            max_keepalive_connections=settings.fetch_max_keepalive_connections,
+        ),
+        headers={"User-Agent": USER_AGENT},
+        follow_redirects=True,
+        transport=transport,
+    )
+    _host_semaphores.clear()
+
+
+async def close_client() -> None:
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _host_semaphores.clear()
+
+
+def get_client() -> "httpx.AsyncClient":
+    if _client is None:
+        init_client()
+    return _client
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).hostname or ""
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(get_settings().fetch_per_host_limit)
+    return _host_semaphores[host]
+
+
+async def fetch(url: str) -> str:
+    """Download ``url`` and return its HTML.
+
+    With the article cache enabled, pages that carried an ETag or
+    Last-Modified are stored compressed on disk and later fetches send a
+    conditional request, answering a 304 from the stored copy.
+    """
+    max_bytes = get_settings().fetch_max_bytes
+    cache, key = get_article_cache(), url_hash(url)
+    cached = await asyncio.to_thread(cache.get, key) if cache else None
+    headers = cached.conditional_headers() if cached else None
+
+    async with _host_semaphore(url):
+        async with get_client().stream("GET", url, headers=headers) as response:
+            if cached and response.status_code == 304:
+                metrics.article_cache_requests.inc(result="not_modified")
+                return cached.html
+            response.raise_for_status()
+
+            content_length = response.headers.get("Content-Length")
+            if content_length and int(content_length) > max_bytes:
+                raise FetchError(f"{url} is larger than {max_bytes} bytes")
+
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) > max_bytes:
+                    raise FetchError(f"{url} is larger than {max_bytes} bytes")
+
+            html = body.decode(response.encoding or "utf-8", errors="replace")
+
+    if cache:
+        metrics.article_cache_requests.inc(result="modified" if cached else "miss")
+        article = CachedArticle(
+            html, response.headers.get("ETag"), response.headers.get("Last-Modified")
+        )
+        if article.conditional_headers():
+            await asyncio.to_thread(cache.put, key, article)
+    return html
@@ -0,0 +1,127 @@
+from datetime import timedelta
+
+from tortoise import BaseDBAsyncClient, timezone
+from tortoise.expressions import F, Q
+from tortoise.transactions import in_transaction
+
+from app.cache import get_summary_cache
+from app.config import get_settings
+from app.notifications import notifier
+
+from app.models.tortoise import (  # isort: skip
+    JobStatus,
+    SummaryJob,
+    SummaryStatus,
+    TextSummary,
+)
+
+EXPIRED_ERROR = "visibility timeout expired"
+
+
+async def enqueue(
+    summary_id: int, url: str, connection: BaseDBAsyncClient | None = None
+) -> int:
+    job = await SummaryJob.create(
+        summary_id=summary_id,
+        url=url,
+        max_attempts=get_settings().job_max_attempts,
+        using_db=connection,
+    )
+    return job.id
+
+
+async def enqueue_many(
+    items: list[tuple[int, str]], connection: BaseDBAsyncClient | None = None
+) -> None:
+    max_attempts = get_settings().job_max_attempts
+    await SummaryJob.bulk_create(
+        [
+            SummaryJob(summary_id=summary_id, url=url, max_attempts=max_attempts)
+            for summary_id, url in items
+        ],
+        using_db=connection,
+    )
+
+
+async def claim() -> SummaryJob | None:
+    """Lock the next runnable job for this worker.
+
+    A job is runnable when it is queued and due, or when a previous claim's
+    visibility timeout expired without the job being completed. Expired jobs
+    out of attempts fail, along with their summaries.
+    """
+    now = timezone.now()
+    visibility_timeout = timedelta(seconds=get_settings().job_visibility_timeout)
+
+    async with in_transaction("default") as connection:
+        expired = (
+            await SummaryJob.filter(
+                status=JobStatus.RUNNING,
+                locked_until__lt=now,
+                attempts__gte=F("max_attempts"),
+            )
+            .select_for_update(skip_locked=True)
+            .using_db(connection)
+        )
+        failed_ids = {expired_job.summary_id for expired_job in expired}
+        if expired:
+            await SummaryJob.filter(
+                id__in=[expired_job.id for expired_job in expired]
+            ).using_db(connection).update(
+                status=JobStatus.FAILED, last_error=EXPIRED_ERROR
+            )
+            await TextSummary.filter(id__in=failed_ids).using_db(connection).update(
+                status=SummaryStatus.FAILED,
+                error=EXPIRED_ERROR,
+                version=F("version") + 1,
+                updated_at=now,
+            )
+
+        job = (
+            await SummaryJob.filter(
+                Q(status=JobStatus.QUEUED, run_after__lte=now)
+                | Q(status=JobStatus.RUNNING, locked_until__lt=now)
+            )
+            .order_by("id")
+            .select_for_update(skip_locked=True)
+            .using_db(connection)
+            .first()
+        )
+        if job is not None:
+            job.status = JobStatus.RUNNING
+            job.attempts += 1
+            job.locked_until = now + visibility_timeout
+            await job.save(
+                using_db=connection,
+                update_fields=["status", "attempts", "locked_until"],
+            )
+
+    for summary_id in failed_ids:
+        await get_summary_cache().invalidate(summary_id)
+        await notifier.publish(summary_id, SummaryStatus.FAILED.value)
+    return job
+
+
+async def complete(job: SummaryJob) -> None:
+    await SummaryJob.filter(id=job.id).update(
+        status=JobStatus.DONE, locked_until=None, last_error=None
+    )
+
+
+async def fail(job: SummaryJob, error: str) -> None:
+    if job.attempts < job.max_attempts:
+        retry_delay = timedelta(seconds=get_settings().job_retry_delay * job.attempts)
+        await SummaryJob.filter(id=job.id).update(
+            status=JobStatus.QUEUED,
+            run_after=timezone.now() + retry_delay,
+            locked_until=None,
+            last_error=error,
+        )
+    else:
+        await SummaryJob.filter(id=job.id).update(
+            status=JobStatus.FAILED, locked_until=None, last_error=error
+        )
+
+
+async def depth() -> int:
+    return await SummaryJob.filter(status=JobStatus.QUEUED).count()
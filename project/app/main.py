@@ -1,16 +1,59 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from app.api import ping, summaries
-from app.db import init_db
+from app import fetcher
+from app.api import metrics, ping, summaries
+from app.compression import CompressionMiddleware
+from app.config import get_settings
+from app.db import DATABASE_URL, close_db, init_db
+from app.metrics import MetricsMiddleware
+from app.notifications import notifier
+from app.profiling import ProfilingMiddleware
+from app.summarizer import check_nlp_data, shutdown_executors, warmup
+from app.writer import close_summary_writer
 
 log = logging.getLogger("uvicorn")
 
 
-def create_application() -> FastAPI:
-    application = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log.info("Starting up...")
+    settings = get_settings()
+    if settings.summarizer_warmup and settings.summary_queue == "background":
+        # Refuse to start without the NLP data, but preload it in the
+        # background so the app answers requests meanwhile.
+        check_nlp_data()
+        warming = asyncio.create_task(asyncio.to_thread(warmup))
+        warming.add_done_callback(_log_warmup_failure)
+    await init_db()
+    if settings.notify_backend == "postgres":
+        await notifier.start(DATABASE_URL)
+
+    yield
+
+    log.info("Shutting down...")
+    shutdown_executors()
+    await close_summary_writer()
+    await fetcher.close_client()
+    await notifier.stop()
+    await close_db()
+
+
+def _log_warmup_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception():
+        log.error(f"Summarizer warmup failed: {task.exception()}")
+
+
+def create_application(lifespan=None) -> FastAPI:
+    application = FastAPI(lifespan=lifespan)
+    application.add_middleware(CompressionMiddleware)
+    application.add_middleware(ProfilingMiddleware)
+    application.add_middleware(MetricsMiddleware)
     application.include_router(ping.router)
+    application.include_router(metrics.router)
     application.include_router(
         summaries.router, prefix="/summaries", tags=["summaries"]
     )
@@ -18,15 +61,4 @@ def create_application() -> FastAPI:
     return application
 
 
-app = create_application()
-
-
-@app.on_event("startup")
-async def startup_event():
-    log.info("Starting up...")
-    init_db(app)
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    log.info("Shutting down...")
+app = create_application(lifespan=lifespan)
@@ -0,0 +1,225 @@
+"""Keep the monthly partitions of ``textsummary`` rolling.
+
+Creates the partitions for the next ``partition_premake_months`` months and,
+when ``partition_retention_months`` is set, archives partitions that fell out
+of the retention window to gzipped CSV files in ``partition_archive_dir``
+before dropping them. Without an archive directory nothing is dropped unless
+``--no-archive`` is given. Run it daily, e.g. from cron:
+
+    python -m app.maintenance
+"""
+import argparse
+import asyncio
+import gzip
+import logging
+import os
+import re
+import tempfile
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from tortoise import BaseDBAsyncClient, connections
+from tortoise.backends.asyncpg import AsyncpgDBClient
+
+from app.config import get_settings
+from app.db import close_db, init_db
+
+log = logging.getLogger("uvicorn")
+
+TABLE = "textsummary"
+PARTITION_NAME = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+DEFAULT_PARTITION = f"{TABLE}_default"
+# The stored columns; "search_vector" is generated.
+COLUMNS = (
+    '"id", "url", "summary", "created_at", "url_hash", '
+    '"updated_at", "version", "status", "error"'
+)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_of(moment: datetime) -> date:
+    """The first day of ``moment``'s month in UTC."""
+    moment = moment.astimezone(timezone.utc)
+    return date(moment.year, moment.month, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_p{month:%Y%m}"
+
+
+def partition_month(name: str) -> date | None:
+    match = PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return date(int(match[1]), int(match[2]), 1)
+
+
+def plan(
+    existing: list[str], now: datetime, premake: int, retention: int
+) -> tuple[list[date], list[str]]:
+    """Return the months to create partitions for and the partitions to expire.
+
+    Partitions cover the current month and ``premake`` months after it. With
+    ``retention`` set, partitions of months before the last ``retention``
+    months expire; 0 keeps them all.
+    """
+    current = month_of(now)
+    wanted = [add_months(current, offset) for offset in range(premake + 1)]
+    missing = [month for month in wanted if partition_name(month) not in existing]
+
+    expired = []
+    if retention > 0:
+        oldest_kept = add_months(current, 1 - retention)
+        for name in sorted(existing):
+            month = partition_month(name)
+            if month is not None and month < oldest_kept:
+                expired.append(name)
+    return missing, expired
+
+
+async def existing_partitions(connection: BaseDBAsyncClient) -> list[str]:
+    rows = await connection.execute_query_dict(
+        "SELECT child.relname AS name FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = $1",
+        [TABLE],
+    )
+    return [row["name"] for row in rows]
+
+
+async def create_partition(
+    connection: BaseDBAsyncClient, month: date, default_partition: bool = True
+) -> None:
+    """Create the partition of ``month``.
+
+    Postgres refuses a new partition while the DEFAULT partition (migration
+    8) holds rows in its range, so the default is detached for the
+    transaction and those rows move into the new partition. Inserts into
+    ``textsummary`` wait on the lock meanwhile.
+    """
+    # Bounds are UTC month starts, the same as migration 7 uses.
+    name = partition_name(month)
+    start = f"{month} 00:00:00+00"
+    end = f"{add_months(month, 1)} 00:00:00+00"
+    create = (
+        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{TABLE}" '
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    )
+    if not default_partition:
+        await connection.execute_script(create)
+        return
+
+    await connection.execute_script(
+        f"""BEGIN;
+ALTER TABLE "{TABLE}" DETACH PARTITION "{DEFAULT_PARTITION}";
+{create};
+WITH "moved" AS (
+    DELETE FROM "{DEFAULT_PARTITION}"
+    WHERE "created_at" >= '{start}' AND "created_at" < '{end}'
+    RETURNING {COLUMNS}
+)
+INSERT INTO "{name}" ({COLUMNS}) SELECT {COLUMNS} FROM "moved";
+ALTER TABLE "{TABLE}" ATTACH PARTITION "{DEFAULT_PARTITION}" DEFAULT;
+COMMIT;"""
+    )
+
+
+async def archive_partition(
+    connection: AsyncpgDBClient, name: str, directory: Path
+) -> Path:
+    """Copy a partition to ``<directory>/<name>.csv.gz``, written atomically."""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.csv.gz"
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+            async with connection.acquire_connection() as pg:
+                await pg.copy_from_table(name, output=f, format="csv", header=True)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+async def drop_partition(connection: BaseDBAsyncClient, name: str) -> None:
+    await connection.execute_script(
+        f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"; DROP TABLE "{name}"'
+    )
+
+
+async def maintain(
+    now: datetime | None = None, dry_run: bool = False, archive: bool = True
+) -> None:
+    """Create upcoming partitions and expire old ones.
+
+    Expired partitions are archived before they are dropped. Dropping them
+    without an archive requires ``archive=False``; with ``archive`` on and no
+    ``partition_archive_dir`` it raises RuntimeError instead of losing rows.
+    """
+    connection = connections.get("default")
+    if not isinstance(connection, AsyncpgDBClient):
+        log.info("Partition maintenance only applies to Postgres, skipping")
+        return
+
+    settings = get_settings()
+    existing = await existing_partitions(connection)
+    missing, expired = plan(
+        existing,
+        now or datetime.now(timezone.utc),
+        settings.partition_premake_months,
+        settings.partition_retention_months,
+    )
+
+    for month in missing:
+        log.info(f"Creating partition {partition_name(month)}")
+        if not dry_run:
+            await create_partition(connection, month, DEFAULT_PARTITION in existing)
+
+    if expired and archive and not settings.partition_archive_dir:
+        raise RuntimeError(
+            f"Refusing to drop {', '.join(expired)} without an archive: "
+            "set PARTITION_ARCHIVE_DIR or pass --no-archive"
+        )
+
+    for name in expired:
+        if dry_run:
+            log.info(f"Would {'archive and ' if archive else ''}drop partition {name}")
+            continue
+        if archive:
+            path = await archive_partition(
+                connection, name, Path(settings.partition_archive_dir)
+            )
+            log.info(f"Archived partition {name} to {path}")
+        else:
+            log.warning(f"Dropping partition {name} without archiving it")
+        await drop_partition(connection, name)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--dry-run", action="store_true", help="log the changes without making them"
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="drop expired partitions without archiving them",
+    )
+    args = parser.parse_args()
+
+    await init_db()
+    try:
+        await maintain(dry_run=args.dry_run, archive=not args.no_archive)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
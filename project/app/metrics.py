@@ -0,0 +1,256 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from starlette.routing import Match
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: tuple, labelvalues: tuple, extra: str = "") -> str:
+    pairs = [
+        f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels[name] for name in self.labelnames)
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def samples(self):
+        for labelvalues, value in sorted(self._values.items()):
+            yield self.name, labelvalues, "", value
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for name, labelvalues, extra, value in self.samples():
+            labels = _format_labels(self.labelnames, labelvalues, extra)
+            lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets: tuple = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        if key not in self._values:
+            self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        counts, _, _ = entry = self._values[key]
+        counts[bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        for labelvalues, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bucket, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bucket)}"'
+                yield f"{self.name}_bucket", labelvalues, le, cumulative
+            yield f"{self.name}_sum", labelvalues, "", total
+            yield f"{self.name}_count", labelvalues, "", count
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list[Metric] = []
+        self.collectors = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector) -> None:
+        """Register a coroutine function that refreshes metrics before a scrape."""
+        self.collectors.append(collector)
+
+    async def collect(self) -> str:
+        for collector in self.collectors:
+            await collector()
+        return "\n".join(metric.render() for metric in self.metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+http_request_duration = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route.",
+        ("method", "route", "status"),
+    )
+)
+http_requests_in_flight = REGISTRY.register(
+    Gauge(
+        "http_requests_in_flight",
+        "HTTP requests currently being served.",
+        ("method", "route"),
+    )
+)
+summarizer_stage_duration = REGISTRY.register(
+    Histogram(
+        "summarizer_stage_duration_seconds",
+        "Time spent in each generate_summary stage.",
+        ("stage",),
+    )
+)
+summarizer_in_flight = REGISTRY.register(
+    Gauge("summarizer_in_flight", "Summaries being generated by this process.")
+)
+summary_write_batch_size = REGISTRY.register(
+    Histogram(
+        "summary_write_batch_size",
+        "Finished summaries stored per write-behind flush.",
+        buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+    )
+)
+summary_write_flush_duration = REGISTRY.register(
+    Histogram(
+        "summary_write_flush_duration_seconds",
+        "Time taken by each write-behind flush.",
+    )
+)
+summarizer_failures = REGISTRY.register(
+    Counter("summarizer_failures_total", "Summaries that raised an error.")
+)
+job_queue_depth = REGISTRY.register(
+    Gauge("summary_job_queue_depth", "Queued jobs in the summaryjob table.")
+)
+summary_cache_requests = REGISTRY.register(
+    Counter(
+        "summary_cache_requests_total", "Summary cache lookups by result.", ("result",)
+    )
+)
+admission_rejections = REGISTRY.register(
+    Counter(
+        "summary_admission_rejections_total",
+        "Rejected summary submissions by reason.",
+        ("reason",),
+    )
+)
+article_cache_requests = REGISTRY.register(
+    Counter(
+        "article_cache_requests_total",
+        "Article fetches by cache result: miss, modified or not_modified.",
+        ("result",),
+    )
+)
+db_pool_connections = REGISTRY.register(
+    Gauge(
+        "db_pool_connections",
+        "Database pool connections by state.",
+        ("connection", "state"),
+    )
+)
+
+
+def _route_template(scope) -> str:
+    app = scope.get("app")
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, route = scope["method"], _route_template(scope)
+        status = "500"
+        finished = False
+
+        def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            http_request_duration.observe(
+                time.perf_counter() - start, method=method, route=route, status=status
+            )
+            http_requests_in_flight.dec(method=method, route=route)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+            # Background tasks run after the response; they are not its latency.
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                finish()
+
+        http_requests_in_flight.inc(method=method, route=route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish()
@@ -1,5 +1,7 @@
 from pydantic import AnyHttpUrl, BaseModel
 
+from app.models.tortoise import SummarySchema
+
 
 class SummaryPayloadSchema(BaseModel):
     url: AnyHttpUrl
@@ -11,3 +13,24 @@ class SummaryResponseSchema(SummaryPayloadSchema):
 
 class SummaryUpdatePayloadSchema(SummaryPayloadSchema):
     summary: str
+
+
+class SummaryPageSchema(BaseModel):
+    items: list[SummarySchema]
+    next_cursor: str | None = None
+
+
+class SummarySearchPageSchema(BaseModel):
+    items: list[SummarySchema]
+    next_offset: int | None = None
+
+
+class SummaryBatchItemSchema(BaseModel):
+    index: int
+    id: int | None = None
+    url: str | None = None
+    errors: list[dict] | None = None
+
+
+class SummaryBatchResponseSchema(BaseModel):
+    items: list[SummaryBatchItemSchema]
@@ -1,14 +1,56 @@
+from enum import Enum
+
 from tortoise import fields, models
 from tortoise.contrib.pydantic import pydantic_model_creator
 
 
+class SummaryStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
 class TextSummary(models.Model):
     url = fields.TextField()
     summary = fields.TextField()
-    created_at = fields.DatetimeField(auto_now=True)
+    status = fields.CharEnumField(SummaryStatus, default=SummaryStatus.PENDING)
+    error = fields.TextField(null=True)
+    url_hash = fields.CharField(max_length=64, null=True, index=True)
+    # The partition key of the table, so it must not change after insert.
+    created_at = fields.DatetimeField(auto_now_add=True, index=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+    version = fields.IntField(default=1)
 
     def __str__(self):
         return self.url
 
 
-SummarySchema = pydantic_model_creator(TextSummary)
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class SummaryJob(models.Model):
+    summary_id = fields.IntField()
+    url = fields.TextField()
+    status = fields.CharEnumField(JobStatus, default=JobStatus.QUEUED)
+    attempts = fields.IntField(default=0)
+    max_attempts = fields.IntField(default=3)
+    run_after = fields.DatetimeField(auto_now_add=True)
+    locked_until = fields.DatetimeField(null=True)
+    last_error = fields.TextField(null=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = (("status", "run_after"),)
+
+    def __str__(self):
+        return f"{self.summary_id}: {self.url}"
+
+
+SummarySchema = pydantic_model_creator(
+    TextSummary, exclude=("url_hash", "updated_at", "version")
+)
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import logging
+
+import asyncpg
+
+from app.cache import get_summary_cache
+from app.config import get_settings
+
+log = logging.getLogger("uvicorn")
+
+CHANNEL = "summary_status"
+
+
+class SummaryNotifier:
+    """Wake up requests waiting for a summary to change status.
+
+    Waiters live in this process. With the Postgres backend, status changes
+    are sent through NOTIFY so that waiters in every API process are woken,
+    whichever process or worker finished the summary.
+    """
+
+    def __init__(self):
+        self._waiters: dict[int, set[asyncio.Future]] = {}
+        self._listener: asyncpg.Connection | None = None
+
+    def subscribe(self, summary_id: int) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(summary_id, set()).add(future)
+        return future
+
+    def unsubscribe(self, summary_id: int, future: asyncio.Future) -> None:
+        waiters = self._waiters.get(summary_id)
+        if waiters is None:
+            return
+        waiters.discard(future)
+        if not waiters:
+            del self._waiters[summary_id]
+
+    def waiting(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    async def wait(self, summary_id: int, future: asyncio.Future, timeout: float):
+        """Wait for ``future`` from ``subscribe``; returns None on timeout."""
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def _deliver(self, summary_id: int, status: str) -> None:
+        for future in self._waiters.pop(summary_id, ()):
+            if not future.done():
+                future.set_result(status)
+
+    async def publish(self, summary_id: int, status: str) -> None:
+        if get_settings().notify_backend == "postgres":
+            from tortoise import connections
+
+            await connections.get("default").execute_query(
+                "SELECT pg_notify($1, $2)",
+                [CHANNEL, json.dumps({"id": summary_id, "status": status})],
+            )
+        else:
+            self._deliver(summary_id, status)
+
+    async def _on_notification(self, summary_id: int, status: str) -> None:
+        # The row changed in another process; drop any stale cached copy.
+        await get_summary_cache().invalidate(summary_id)
+        self._deliver(summary_id, status)
+
+    def _listen(self, connection, pid, channel, payload) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            log.warning(f"Ignoring malformed {CHANNEL} payload: {payload!r}")
+            return
+        asyncio.get_running_loop().create_task(
+            self._on_notification(message["id"], message["status"])
+        )
+
+    async def start(self, dsn: str) -> None:
+        if self._listener is not None:
+            return
+        self._listener = await asyncpg.connect(dsn)
+        await self._listener.add_listener(CHANNEL, self._listen)
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            await self._listener.close()
+        self._listener = None
+
+
+notifier = SummaryNotifier()
@@ -0,0 +1,195 @@
+import asyncio
+import cProfile
+import functools
+import hmac
+import logging
+import os
+import random
+import re
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from app.config import get_settings
+
+log = logging.getLogger("uvicorn")
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = "profile"
+PROFILE_FILE_HEADER = b"x-profile-file"
+
+
+class ProfileRing:
+    """The newest ``max_files`` cProfile dumps in a directory.
+
+    File names start with the creation time in nanoseconds, so they sort
+    oldest first; writing a new dump removes the oldest ones beyond the
+    limit. Open a dump with ``python -m pstats <file>`` or snakeviz.
+    """
+
+    def __init__(self, directory: str | Path, max_files: int):
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, name: str) -> Path:
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_")[:100]
+        return self.directory / f"{time.time_ns()}-{os.getpid()}-{name}.prof"
+
+    def save(self, profiler: cProfile.Profile, path: Path) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            profiler.dump_stats(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._prune()
+
+    def _prune(self) -> None:
+        files = sorted(self.directory.glob("*.prof"))
+        stale = max(len(files) - self.max_files, 0)
+        for path in files[:stale]:
+            path.unlink(missing_ok=True)
+
+
+_profile_ring: ProfileRing | None = None
+_active = False
+
+
+def get_profile_ring() -> ProfileRing | None:
+    """Return the shared ring, or None when ``profile_dir`` is unset."""
+    global _profile_ring
+
+    settings = get_settings()
+    if not settings.profile_dir:
+        return None
+    if _profile_ring is None:
+        _profile_ring = ProfileRing(settings.profile_dir, settings.profile_max_files)
+    return _profile_ring
+
+
+def reset_profile_ring() -> None:
+    global _profile_ring
+
+    _profile_ring = None
+
+
+def sampled() -> bool:
+    rate = get_settings().profile_sample_rate
+    return rate > 0 and random.random() < rate
+
+
+def requested(scope) -> bool:
+    """Whether the request asks for a profile with the admin ``profile_token``."""
+    token = get_settings().profile_token
+    if not token:
+        return False
+
+    values = [
+        value.decode("latin-1")
+        for name, value in scope.get("headers", ())
+        if name == PROFILE_HEADER
+    ]
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    values.extend(query.get(PROFILE_QUERY, ()))
+    return any(hmac.compare_digest(value, token) for value in values)
+
+
+@asynccontextmanager
+async def profile(name: str, enabled: bool = True):
+    """Profile the enclosed block into the ring, yielding the dump's file name.
+
+    cProfile records everything the thread runs, so coroutines interleaved on
+    the event loop show up too. One block is profiled at a time; the block
+    yields None and runs unprofiled when profiling is off, not ``enabled`` or
+    already busy.
+    """
+    global _active
+
+    ring = get_profile_ring() if enabled and not _active else None
+    if ring is None:
+        yield None
+        return
+
+    path = ring.path(name)
+    profiler = cProfile.Profile()
+    _active = True
+    profiler.enable()
+    try:
+        yield path.name
+    finally:
+        profiler.disable()
+        _active = False
+        try:
+            await asyncio.to_thread(ring.save, profiler, path)
+        except OSError as exc:
+            log.error(f"Saving profile {path.name} failed: {exc!r}")
+
+
+def profiled_call(directory: str, max_files: int, name: str, func, *args):
+    """Run ``func(*args)`` under cProfile and save the dump to the ring.
+
+    This is module level so a process pool can pickle it, and the dump is
+    written by whichever process runs the call.
+    """
+    ring = ProfileRing(directory, max_files)
+    path = ring.path(name)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args)
+    finally:
+        try:
+            ring.save(profiler, path)
+        except OSError as exc:
+            log.error(f"Saving profile {path.name} failed: {exc!r}")
+
+
+def in_executor(func, name: str):
+    """Wrap ``func`` to profile itself inside an executor worker.
+
+    A profile taken on the event loop only shows the wait for the executor;
+    the wrapped call writes its own dump next to it. ``func`` is returned
+    as is when profiling is off.
+    """
+    ring = get_profile_ring()
+    if ring is None:
+        return func
+    return functools.partial(
+        profiled_call, str(ring.directory), ring.max_files, name, func
+    )
+
+
+class ProfilingMiddleware:
+    """Profile requests that carry the admin token, plus a sampled fraction.
+
+    The token goes in an ``X-Profile`` header or a ``?profile=`` query
+    parameter, and such responses name the dump in ``X-Profile-File``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not get_settings().profile_dir:
+            await self.app(scope, receive, send)
+            return
+
+        asked = requested(scope)
+        if not asked and not sampled():
+            await self.app(scope, receive, send)
+            return
+
+        async with profile(f"{scope['method']} {scope['path']}") as file_name:
+
+            async def send_wrapper(message):
+                if asked and file_name and message["type"] == "http.response.start":
+                    headers = list(message.get("headers", ()))
+                    headers.append((PROFILE_FILE_HEADER, file_name.encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
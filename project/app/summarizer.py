@@ -1,21 +1,300 @@
-import nltk
-from newspaper import Article
+import asyncio
+import logging
+import time
 
-from app.models.tortoise import TextSummary
+from tortoise import timezone
+from tortoise.expressions import F
 
+from app import fetcher, metrics, profiling
+from app.cache import get_summary_cache
+from app.config import get_settings
+from app.models.tortoise import SummaryStatus, TextSummary
+from app.notifications import notifier
+from app.writer import get_summary_writer
+
+from concurrent.futures import (  # isort: skip
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+
+log = logging.getLogger("uvicorn")
+
+# newspaper and nltk (with lxml, PIL, requests...) are imported on first use,
+# so processes that never summarize do not pay for them at startup.
+
+EXECUTOR_MODES = ("process", "thread", "inline")
+PUNKT_RESOURCE = "tokenizers/punkt/english.pickle"
+
+_nlp_executor: Executor | None = None
+
+
+def get_nlp_executor() -> Executor | None:
+    global _nlp_executor
+
+    settings = get_settings()
+    if settings.summarizer_executor not in EXECUTOR_MODES:
+        raise ValueError(
+            f"Unknown summarizer executor: {settings.summarizer_executor!r}"
+        )
+    if settings.summarizer_executor == "inline":
+        return None
+    if _nlp_executor is None:
+        if settings.summarizer_executor == "process":
+            _nlp_executor = ProcessPoolExecutor(
+                max_workers=settings.summarizer_workers, initializer=warmup
+            )
+        else:
+            _nlp_executor = ThreadPoolExecutor(
+                max_workers=settings.summarizer_workers, thread_name_prefix="nlp"
+            )
+    return _nlp_executor
+
+
+def shutdown_executors() -> None:
+    global _nlp_executor
+
+    if _nlp_executor is not None:
+        _nlp_executor.shutdown(wait=False, cancel_futures=True)
+    _nlp_executor = None
+
+
+def check_nlp_data() -> None:
+    """Raise unless the NLTK data ``summarize_html`` needs is installed."""
+    import nltk
+
+    try:
+        nltk.data.find(PUNKT_RESOURCE)
+    except LookupError as exc:
+        raise RuntimeError(
+            "NLTK punkt data is missing, install it with "
+            "`python -m nltk.downloader punkt`"
+        ) from exc
+
+
+def warmup() -> None:
+    """Load the NLP resources used by ``summarize_html`` into this process.
+
+    The data must be installed ahead of time; nothing is downloaded here. When
+    this runs before workers fork (e.g. gunicorn --preload), they share the
+    loaded pages copy-on-write.
+    """
+    import nltk
+    from newspaper import nlp
+    from newspaper.text import StopWords
+
+    from app.engines import get_engine
+
+    check_nlp_data()
+    nltk.data.load(PUNKT_RESOURCE)
+    nlp.load_stopwords("en")
+    StopWords("en")
+    get_engine(get_settings().summarizer_engine)
+
+
+def _parse(url: str, html: str):
+    from newspaper import Article
 
-async def generate_summary(summary_id: int, url: str) -> str:
     article = Article(url)
-    article.download()
+    article.set_html(html)
     article.parse()
+    return article
+
+
+def summarize_html(
+    url: str, html: str, engine: str = "newspaper"
+) -> tuple[str, dict[str, float]]:
+    """Return the summary and the seconds spent in each stage.
+
+    This usually runs in a worker process, so stage timings travel back with
+    the result instead of being recorded here.
+    """
+    from app.engines import get_engine
+
+    timings = {}
+
+    start = time.perf_counter()
+    article = _parse(url, html)
+    timings["parse"] = time.perf_counter() - start
 
+    start = time.perf_counter()
+    summary = get_engine(engine).summarize(article.title, article.text)
+    timings["nlp"] = time.perf_counter() - start
+
+    return summary, timings
+
+
+def summarize_html_many(
+    pages: list[tuple[str, str]], engine: str = "newspaper"
+) -> list[tuple[str, dict[str, float]] | Exception]:
+    """Summarize several pages in one call, like ``summarize_html`` for each.
+
+    A page that fails to parse gets its exception in place of a result, so it
+    does not fail the rest of the batch.
+    """
+    from app.engines import get_engine
+
+    results, articles = [], {}
+    for index, (url, html) in enumerate(pages):
+        start = time.perf_counter()
+        try:
+            articles[index] = _parse(url, html)
+        except Exception as exc:
+            results.append(exc)
+        else:
+            results.append({"parse": time.perf_counter() - start})
+
+    start = time.perf_counter()
+    summaries = get_engine(engine).summarize_many(
+        [(article.title, article.text) for article in articles.values()]
+    )
+    nlp_seconds = (time.perf_counter() - start) / max(len(articles), 1)
+
+    for index, summary in zip(articles, summaries):
+        results[index] = (summary, {**results[index], "nlp": nlp_seconds})
+    return results
+
+
+async def _run(executor: Executor | None, func, *args):
+    if executor is None:
+        return func(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, func, *args)
+
+
+async def _set_status(summary_id: int, status: SummaryStatus, **values) -> None:
+    await TextSummary.filter(id=summary_id).update(
+        status=status, version=F("version") + 1, updated_at=timezone.now(), **values
+    )
+    await get_summary_cache().invalidate(summary_id)
+
+
+async def _download(summary_id: int, url: str) -> str:
+    await _set_status(summary_id, SummaryStatus.RUNNING)
+    with metrics.summarizer_stage_duration.time(stage="download"):
+        return await fetcher.fetch(url)
+
+
+async def _store(summary_id: int, summary: str, timings: dict[str, float]) -> None:
+    for stage, seconds in timings.items():
+        metrics.summarizer_stage_duration.observe(seconds, stage=stage)
+
+    with metrics.summarizer_stage_duration.time(stage="update"):
+        await get_summary_writer().write(summary_id, summary)
+    await notifier.publish(summary_id, SummaryStatus.DONE.value)
+
+
+async def _record_failure(summary_id: int, exc: Exception, final: bool) -> None:
+    metrics.summarizer_failures.inc()
+    if final:
+        await _set_status(summary_id, SummaryStatus.FAILED, error=repr(exc))
+        await notifier.publish(summary_id, SummaryStatus.FAILED.value)
+    else:
+        await _set_status(summary_id, SummaryStatus.PENDING, error=repr(exc))
+
+
+async def generate_summary(summary_id: int, url: str, final: bool = True) -> str:
+    """Summarize ``url`` into row ``summary_id`` and notify waiting clients.
+
+    A failure that will be retried (``final=False``) puts the row back to
+    pending with the error recorded, instead of failing it. A
+    ``profile_sample_rate`` fraction of runs is profiled into the profile ring;
+    with an executor, ``summarize_html`` gets a dump of its own from there.
+    """
+    engine = get_settings().summarizer_engine
+    metrics.summarizer_in_flight.inc()
     try:
-        nltk.data.find("tokenizers/punkt")
-    except LookupError:
-        nltk.download("punkt")
+        name = f"summary {summary_id}"
+        async with profiling.profile(name, profiling.sampled()) as file_name:
+            html = await _download(summary_id, url)
+            executor = get_nlp_executor()
+            summarize = summarize_html
+            if file_name and executor is not None:
+                summarize = profiling.in_executor(summarize, f"{name} nlp")
+            summary, timings = await _run(executor, summarize, url, html, engine)
+            await _store(summary_id, summary, timings)
+    except Exception as exc:
+        await _record_failure(summary_id, exc, final)
+        raise
     finally:
-        article.nlp()
+        metrics.summarizer_in_flight.dec()
+
+
+async def _generate_chunk(items: list[tuple[int, str]]) -> None:
+    settings = get_settings()
+    downloads = await asyncio.gather(
+        *(_download(summary_id, url) for summary_id, url in items),
+        return_exceptions=True,
+    )
+    outcomes, pages = {}, []
+    for (summary_id, url), html in zip(items, downloads):
+        if isinstance(html, Exception):
+            outcomes[summary_id] = html
+        else:
+            pages.append((summary_id, url, html))
+
+    batch_size = min(
+        settings.summarizer_batch_size,
+        -(-len(pages) // settings.summarizer_workers),
+    )
+    batches = []
+    for start in range(0, len(pages), max(batch_size, 1)):
+        stop = start + batch_size
+        batches.append(pages[start:stop])
+    results = await asyncio.gather(
+        *(
+            _run(
+                get_nlp_executor(),
+                summarize_html_many,
+                [(url, html) for _, url, html in batch],
+                settings.summarizer_engine,
+            )
+            for batch in batches
+        ),
+        return_exceptions=True,
+    )
+    for batch, result in zip(batches, results):
+        if isinstance(result, Exception):
+            result = [result] * len(batch)
+        for (summary_id, _, _), outcome in zip(batch, result):
+            outcomes[summary_id] = outcome
+
+    # Stores run together so the summary writer can coalesce them.
+    done = [
+        (summary_id, outcome)
+        for summary_id, outcome in outcomes.items()
+        if not isinstance(outcome, Exception)
+    ]
+    stored = await asyncio.gather(
+        *(_store(summary_id, *outcome) for summary_id, outcome in done),
+        return_exceptions=True,
+    )
+    for (summary_id, _), result in zip(done, stored):
+        if isinstance(result, Exception):
+            outcomes[summary_id] = result
+
+    for summary_id, url in items:
+        outcome = outcomes[summary_id]
+        if isinstance(outcome, Exception):
+            log.error(f"Summarizing {url} ({summary_id}) failed: {outcome!r}")
+            await _record_failure(summary_id, outcome, final=True)
+
 
-    summary = article.summary
+async def generate_summaries(
+    items: list[tuple[int, str]], max_in_flight: int | None = None
+) -> None:
+    """Summarize many urls, sending pages to the executor in batches.
 
-    await TextSummary.filter(id=summary_id).update(summary=summary)
+    At most ``max_in_flight`` urls are worked on at once; each such chunk is
+    downloaded concurrently and then split into at most one batch per
+    executor worker, so each batch costs a single round trip.
+    """
+    chunk_size = max_in_flight or len(items) or 1
+    for start in range(0, len(items), chunk_size):
+        stop = start + chunk_size
+        chunk = items[start:stop]
+        metrics.summarizer_in_flight.inc(len(chunk))
+        try:
+            await _generate_chunk(chunk)
+        finally:
+            metrics.summarizer_in_flight.dec(len(chunk))
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import signal
+
+from app import fetcher, jobs
+from app.config import get_settings
+from app.db import close_db, init_db
+from app.summarizer import generate_summary, shutdown_executors, warmup
+from app.writer import close_summary_writer
+
+log = logging.getLogger("uvicorn")
+
+
+MAX_BACKOFF = 30.0
+
+
+async def wait_or_stop(stop: asyncio.Event, timeout: float) -> None:
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def process(job) -> None:
+    try:
+        await generate_summary(
+            job.summary_id, job.url, final=job.attempts >= job.max_attempts
+        )
+    except Exception as exc:
+        log.exception(f"Job {job.id} failed on attempt {job.attempts}")
+        await jobs.fail(job, repr(exc))
+    else:
+        await jobs.complete(job)
+
+
+async def work(worker_id: int, stop: asyncio.Event) -> None:
+    """Claim and process jobs until ``stop`` is set.
+
+    Database errors while claiming or settling a job are logged and retried
+    after a backoff that doubles up to ``MAX_BACKOFF`` seconds; a job left
+    RUNNING is claimed again once its visibility timeout expires.
+    """
+    poll_interval = get_settings().job_poll_interval
+    backoff = poll_interval
+
+    while not stop.is_set():
+        try:
+            job = await jobs.claim()
+            if job is not None:
+                log.info(f"Worker {worker_id} processing job {job.id} ({job.url})")
+                await process(job)
+        except Exception:
+            log.exception(f"Worker {worker_id} failed, retrying in {backoff}s")
+            await wait_or_stop(stop, backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+            continue
+
+        backoff = poll_interval
+        if job is None:
+            await wait_or_stop(stop, poll_interval)
+
+
+async def run_worker() -> None:
+    settings = get_settings()
+    stop = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    if settings.summarizer_warmup:
+        warmup()
+
+    await init_db()
+    fetcher.init_client()
+    log.info(f"Starting {settings.worker_concurrency} summarization workers...")
+    try:
+        await asyncio.gather(
+            *(work(worker_id, stop) for worker_id in range(settings.worker_concurrency))
+        )
+    finally:
+        log.info("Shutting down workers...")
+        shutdown_executors()
+        await close_summary_writer()
+        await fetcher.close_client()
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker())
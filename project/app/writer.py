@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+
+from tortoise import connections
+from tortoise.backends.asyncpg import AsyncpgDBClient
+
+from app import metrics
+from app.cache import get_summary_cache
+from app.config import get_settings
+
+log = logging.getLogger("uvicorn")
+
+
+def _update_sql(connection, rows: int) -> str:
+    if isinstance(connection, AsyncpgDBClient):
+        values = (f"(${2 * i + 1}::int, ${2 * i + 2}::text)" for i in range(rows))
+    else:
+        values = ("(?, ?)" for _ in range(rows))
+    # VALUES columns are named column1, column2... on Postgres and SQLite alike.
+    return (
+        'UPDATE "textsummary" SET "summary" = "v"."column2", '
+        '"status" = \'done\', "error" = NULL, '
+        '"version" = "version" + 1, "updated_at" = CURRENT_TIMESTAMP '
+        f'FROM (VALUES {", ".join(values)}) AS "v" '
+        'WHERE "textsummary"."id" = "v"."column1"'
+    )
+
+
+class SummaryWriter:
+    """Write-behind buffer for finished summaries.
+
+    ``write`` returns once the summary is stored. Summaries finished within
+    ``window`` seconds of each other, up to ``max_items``, are stored with a
+    single ``UPDATE ... FROM (VALUES ...)``.
+    """
+
+    def __init__(self, window: float, max_items: int):
+        self.window = window
+        self.max_items = max_items
+        self._buffer: dict[int, str] = {}
+        self._waiters: list[asyncio.Future] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def write(self, summary_id: int, summary: str) -> None:
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._buffer[summary_id] = summary
+        self._waiters.append(waiter)
+
+        if len(self._buffer) >= self.max_items or self.window <= 0:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._schedule_flush)
+        await waiter
+
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+
+        buffer, waiters = self._buffer, self._waiters
+        self._buffer, self._waiters = {}, []
+        task = asyncio.get_running_loop().create_task(self._flush(buffer, waiters))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, buffer: dict[int, str], waiters: list[asyncio.Future]):
+        start = time.perf_counter()
+        try:
+            connection = connections.get("default")
+            params = [value for row in buffer.items() for value in row]
+            await connection.execute_query(_update_sql(connection, len(buffer)), params)
+            cache = get_summary_cache()
+            for summary_id in buffer:
+                await cache.invalidate(summary_id)
+        except Exception as exc:
+            log.error(f"Writing {len(buffer)} summaries failed: {exc!r}")
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(exc)
+            return
+        finally:
+            metrics.summary_write_batch_size.observe(len(buffer))
+            metrics.summary_write_flush_duration.observe(time.perf_counter() - start)
+
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def close(self) -> None:
+        """Flush whatever is buffered and wait for flushes in progress."""
+        self._schedule_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+
+_summary_writer: SummaryWriter | None = None
+
+
+def get_summary_writer() -> SummaryWriter:
+    """Return the process writer, created on first use.
+
+    The writer belongs to the event loop that first uses it, so whoever owns
+    that loop (the app lifespan, the worker) must ``close_summary_writer``
+    before the loop ends.
+    """
+    global _summary_writer
+
+    if _summary_writer is None:
+        settings = get_settings()
+        _summary_writer = SummaryWriter(
+            settings.summary_write_window, settings.summary_write_max_items
+        )
+    return _summary_writer
+
+
+async def close_summary_writer() -> None:
+    global _summary_writer
+
+    if _summary_writer is not None:
+        await _summary_writer.close()
+    _summary_writer = None
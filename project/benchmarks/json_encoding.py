@@ -0,0 +1,75 @@
+"""Compare the default and trusted JSON paths for summary list responses.
+
+Run from the project directory:
+
+    python -m benchmarks.json_encoding --rows 50 --iterations 2000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from app.api import summaries
+from app.api.responses import TrustedJSONResponse
+
+
+def make_page(rows: int) -> dict:
+    created_at = datetime.now(timezone.utc)
+    items = [
+        {
+            "id": id,
+            "url": f"https://example.com/articles/{id}",
+            "summary": "Lorem ipsum dolor sit amet. " * 20,
+            "created_at": created_at,
+        }
+        for id in range(1, rows + 1)
+    ]
+    return {"items": items, "next_cursor": None}
+
+
+def list_route():
+    for route in summaries.router.routes:
+        if route.name == "read_all_summaries":
+            return route
+    raise LookupError("read_all_summaries route not found")
+
+
+async def default_path(route, page: dict) -> bytes:
+    content = await serialize_response(
+        field=route.response_field, response_content=page
+    )
+    return JSONResponse(content).body
+
+
+async def trusted_path(route, page: dict) -> bytes:
+    return TrustedJSONResponse(page).body
+
+
+async def measure(func, route, page: dict, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await func(route, page)
+    return time.perf_counter() - start
+
+
+async def main(rows: int, iterations: int) -> None:
+    route = list_route()
+    page = make_page(rows)
+
+    for name, func in (("default", default_path), ("trusted", trusted_path)):
+        elapsed = await measure(func, route, page, iterations)
+        print(
+            f"{name:>8}: {iterations / elapsed:10.0f} responses/s "
+            f"({elapsed / iterations * 1e6:8.1f} us per {rows}-row page)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.iterations))
@@ -0,0 +1,250 @@
+"""Offline load test for the summaries API.
+
+Drives the ASGI app in-process with httpx against a local database. Articles
+are served from benchmarks/fixtures, so no network access is needed. Run
+from the project directory:
+
+    python -m benchmarks.load --requests 2000 --concurrency 32
+    python -m benchmarks.load --compare results/a.json results/b.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from tortoise import Tortoise
+
+from app import fetcher, summarizer
+from app.config import get_settings
+from app.engines import ENGINES
+from app.main import create_application
+
+BENCHMARKS_DIR = Path(__file__).parent
+FIXTURES_DIR = BENCHMARKS_DIR / "fixtures"
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+
+DEFAULT_MIX = {"post": 2, "get": 10, "list": 3, "put": 1, "delete": 1}
+
+
+def load_fixtures() -> dict[str, str]:
+    return {path.stem: path.read_text() for path in sorted(FIXTURES_DIR.glob("*.html"))}
+
+
+def stub_summarize_html(
+    url: str, html: str, engine: str = "stub"
+) -> tuple[str, dict[str, float]]:
+    return html[:200], {}
+
+
+def install_offline_summarizer(fixtures: dict[str, str], engine: str) -> None:
+    async def fetch_fixture(url: str) -> str:
+        return fixtures[httpx.URL(url).path.strip("/")]
+
+    fetcher.fetch = fetch_fixture
+    if engine == "stub":
+        summarizer.summarize_html = stub_summarize_html
+    else:
+        get_settings().summarizer_engine = engine
+    # Monkeypatched functions are not visible to a spawned process pool.
+    get_settings().summarizer_executor = "thread"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, round(pct / 100 * (len(values) - 1)))
+    return values[index]
+
+
+def summarize_latencies(latencies: list[float], elapsed: float) -> dict:
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+    }
+
+
+class Workload:
+    def __init__(self, client: httpx.AsyncClient, fixtures: list[str], mix: dict):
+        self.client = client
+        self.fixtures = fixtures
+        self.operations = list(mix)
+        self.weights = [mix[operation] for operation in self.operations]
+        self.ids: list[int] = []
+        self.counter = 0
+        self.latencies: dict[str, list[float]] = {op: [] for op in self.operations}
+        self.errors: dict[str, int] = {op: 0 for op in self.operations}
+
+    def _url(self) -> str:
+        self.counter += 1
+        return f"https://fixtures.local/{random.choice(self.fixtures)}?n={self.counter}"
+
+    async def _request(self, operation: str) -> tuple[str, httpx.Response]:
+        if operation == "post" or not self.ids:
+            operation = "post"
+            response = await self.client.post("/summaries/", json={"url": self._url()})
+            if response.status_code == 201:
+                self.ids.append(response.json()["id"])
+            return operation, response
+        if operation == "list":
+            return operation, await self.client.get("/summaries/")
+
+        summary_id = random.choice(self.ids)
+        if operation == "get":
+            response = await self.client.get(f"/summaries/{summary_id}/")
+        elif operation == "put":
+            response = await self.client.put(
+                f"/summaries/{summary_id}/",
+                json={"url": self._url(), "summary": "updated by benchmark"},
+            )
+        else:
+            self.ids.remove(summary_id)
+            response = await self.client.delete(f"/summaries/{summary_id}/")
+        return operation, response
+
+    async def worker(self, remaining: list[int]) -> None:
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            operation = random.choices(self.operations, self.weights)[0]
+            start = time.perf_counter()
+            operation, response = await self._request(operation)
+            self.latencies[operation].append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                self.errors[operation] += 1
+
+
+async def run(args) -> dict:
+    fixtures = load_fixtures()
+    install_offline_summarizer(fixtures, args.summarizer)
+    random.seed(args.seed)
+
+    await Tortoise.init(db_url=args.db_url, modules={"models": ["app.models.tortoise"]})
+    await Tortoise.generate_schemas()
+    fetcher.init_client()
+
+    app = create_application()
+    mix = json.loads(args.mix) if args.mix else DEFAULT_MIX
+    try:
+        async with httpx.AsyncClient(app=app, base_url="http://benchmark") as client:
+            workload = Workload(client, list(fixtures), mix)
+            remaining = [args.requests]
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(workload.worker(remaining) for _ in range(args.concurrency))
+            )
+            elapsed = time.perf_counter() - start
+    finally:
+        summarizer.shutdown_executors()
+        await fetcher.close_client()
+        await Tortoise.close_connections()
+
+    all_latencies = [
+        value for values in workload.latencies.values() for value in values
+    ]
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "summarizer": args.summarizer,
+            "db_url": args.db_url,
+            "mix": mix,
+            "seed": args.seed,
+        },
+        "elapsed_s": elapsed,
+        "overall": summarize_latencies(all_latencies, elapsed),
+        "operations": {
+            operation: {
+                **summarize_latencies(latencies, elapsed),
+                "errors": workload.errors[operation],
+            }
+            for operation, latencies in workload.latencies.items()
+        },
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result: dict) -> None:
+    print(f"commit {result['commit']}  elapsed {result['elapsed_s']:.2f}s")
+    print(f"{'op':>8} {'reqs':>7} {'rps':>9} {'p50ms':>8} {'p90ms':>8} {'p99ms':>8}")
+    rows = [("overall", result["overall"]), *result["operations"].items()]
+    for name, stats in rows:
+        print(
+            f"{name:>8} {stats['requests']:>7} {stats['rps']:>9.1f} "
+            f"{stats['p50_ms']:>8.2f} {stats['p90_ms']:>8.2f} {stats['p99_ms']:>8.2f}"
+        )
+
+
+def compare(baseline_path: str, candidate_path: str) -> None:
+    baseline = json.loads(Path(baseline_path).read_text())
+    candidate = json.loads(Path(candidate_path).read_text())
+    print(f"{baseline['commit']} -> {candidate['commit']}")
+    for name in ("overall", *candidate["operations"]):
+        old = baseline["overall"] if name == "overall" else baseline["operations"][name]
+        new = (
+            candidate["overall"] if name == "overall" else candidate["operations"][name]
+        )
+        changes = []
+        for metric in ("rps", "p50_ms", "p99_ms"):
+            delta = (
+                (new[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0
+            )
+            changes.append(
+                f"{metric} {old[metric]:.1f} -> {new[metric]:.1f} ({delta:+.1f}%)"
+            )
+        print(f"{name:>8}: " + ", ".join(changes))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--summarizer", choices=("stub", *ENGINES), default="stub")
+    parser.add_argument("--db-url", default="sqlite://:memory:")
+    parser.add_argument("--mix", help='JSON weights, e.g. {"post": 1, "get": 5}')
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    result = asyncio.run(run(args))
+    print_report(result)
+
+    output = Path(args.output) if args.output else None
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{result['commit'] or 'unknown'}.json"
+    output.write_text(json.dumps(result, indent=2))
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Measure cold start: app import time and time to the first /ping.
+
+Each run starts a fresh interpreter, like a newly scheduled container. Run
+from the project directory:
+
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+HEAVY_MODULES = ("newspaper", "nltk", "lxml", "PIL", "httpx", "numpy")
+
+IMPORT_PROBE = f"""
+import sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+heavy = [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env: dict) -> tuple[float, str]:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    return float(output[0]), output[1] if len(output) > 1 else ""
+
+
+def measure_first_ping(env: dict, timeout: float) -> float:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/ping"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise TimeoutError(f"no answer from {url} within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--db-url", default="sqlite://:memory:")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument(
+        "--warmup", action="store_true", help="warm the summarizer up on startup"
+    )
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "DATABASE_URL": args.db_url,
+        "SUMMARIZER_WARMUP": "1" if args.warmup else "0",
+    }
+
+    imports = [measure_import(env) for _ in range(args.runs)]
+    pings = [measure_first_ping(env, args.timeout) for _ in range(args.runs)]
+
+    import_times = [elapsed for elapsed, _ in imports]
+    print(f"{'':>16} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for name, values in (("import app.main", import_times), ("first /ping", pings)):
+        print(
+            f"{name:>16} {statistics.median(values) * 1000:10.1f} "
+            f"{min(values) * 1000:10.1f} {max(values) * 1000:10.1f}"
+        )
+    print(f"heavy modules loaded by import: {imports[-1][1] or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
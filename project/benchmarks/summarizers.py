@@ -0,0 +1,99 @@
+"""Compare summarizer engines for speed and output quality.
+
+Articles come from benchmarks/fixtures, and quality is ROUGE-1 against the
+reference sentences in fixtures/references.json. Requires the NLTK punkt
+data. Run from the project directory:
+
+    python -m benchmarks.summarizers --iterations 200 --scale 20
+"""
+import argparse
+import json
+import time
+from collections import Counter
+
+from newspaper import Article, nlp
+
+from app.engines import ENGINES, get_engine
+from benchmarks.load import FIXTURES_DIR, load_fixtures
+
+
+def parse_fixtures() -> dict[str, tuple[str, str]]:
+    articles = {}
+    for name, html in load_fixtures().items():
+        article = Article(f"https://example.com/{name}")
+        article.set_html(html)
+        article.parse()
+        articles[name] = (article.title, article.text)
+    return articles
+
+
+def rouge_1(summary: str, reference: str) -> dict[str, float]:
+    candidate = Counter(nlp.split_words(summary))
+    expected = Counter(nlp.split_words(reference))
+    overlap = sum((candidate & expected).values())
+    recall = overlap / max(sum(expected.values()), 1)
+    precision = overlap / max(sum(candidate.values()), 1)
+    f1 = 2 * recall * precision / (recall + precision) if overlap else 0.0
+    return {"recall": recall, "precision": precision, "f1": f1}
+
+
+def measure(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def report_quality(articles: dict, references: dict) -> None:
+    print("quality (ROUGE-1 against references.json)")
+    print(f"{'engine':>10} {'fixture':>14} {'recall':>7} {'prec':>7} {'f1':>7}")
+    for name in ENGINES:
+        engine = get_engine(name)
+        for fixture, (title, text) in articles.items():
+            if fixture not in references:
+                continue
+            scores = rouge_1(
+                engine.summarize(title, text), " ".join(references[fixture])
+            )
+            print(
+                f"{name:>10} {fixture:>14} {scores['recall']:7.3f} "
+                f"{scores['precision']:7.3f} {scores['f1']:7.3f}"
+            )
+
+
+def report_speed(articles: dict, iterations: int, scale: int) -> None:
+    # A long article built from every fixture shows how scoring scales.
+    long_title = "; ".join(title for title, _ in articles.values())
+    long_text = "\n\n".join(text for _, text in articles.values()) * scale
+    batch = list(articles.values()) * scale
+
+    print(f"\nspeed (ms per call, {iterations} iterations)")
+    print(f"{'engine':>10} {'fixture':>10} {'long':>10} {'batch':>10}")
+    for name in ENGINES:
+        engine = get_engine(name)
+        fixture = measure(
+            lambda: [engine.summarize(*article) for article in articles.values()],
+            iterations,
+        ) / len(articles)
+        long = measure(lambda: engine.summarize(long_title, long_text), iterations)
+        many = measure(lambda: engine.summarize_many(batch), iterations)
+        print(
+            f"{name:>10} {fixture * 1000:10.3f} {long * 1000:10.3f} "
+            f"{many * 1000:10.3f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--scale", type=int, default=10, help="fixture repeats")
+    args = parser.parse_args()
+
+    articles = parse_fixtures()
+    references = json.loads((FIXTURES_DIR / "references.json").read_text())
+    report_quality(articles, references)
+    report_speed(articles, args.iterations, args.scale)
+
+
+if __name__ == "__main__":
+    main()
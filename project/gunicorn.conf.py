@@ -0,0 +1,12 @@
+# Load the app, and with it the NLP resources, in the master process so that
+# forked workers share them copy-on-write.
+preload_app = True
+
+
+def on_starting(server):
+    from app.config import get_settings
+    from app.summarizer import warmup
+
+    settings = get_settings()
+    if settings.summarizer_warmup and settings.summary_queue == "background":
+        warmup()
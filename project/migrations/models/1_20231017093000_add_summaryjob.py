@@ -0,0 +1,24 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "summaryjob" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "summary_id" INT NOT NULL,
+    "url" TEXT NOT NULL,
+    "status" VARCHAR(7) NOT NULL  DEFAULT 'queued',
+    "attempts" INT NOT NULL  DEFAULT 0,
+    "max_attempts" INT NOT NULL  DEFAULT 3,
+    "run_after" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "locked_until" TIMESTAMPTZ,
+    "last_error" TEXT,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS "idx_summaryjob_status_2d1b5e" ON "summaryjob" ("status", "run_after");
+COMMENT ON COLUMN "summaryjob"."status" IS 'QUEUED: queued\\nRUNNING: running\\nDONE: done\\nFAILED: failed';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "summaryjob";"""
@@ -0,0 +1,13 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "textsummary" ADD "url_hash" VARCHAR(64);
+        CREATE INDEX "idx_textsummary_url_has_5b3f3c" ON "textsummary" ("url_hash");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX "idx_textsummary_url_has_5b3f3c";
+        ALTER TABLE "textsummary" DROP COLUMN "url_hash";"""
@@ -0,0 +1,18 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "textsummary" ADD "search_vector" TSVECTOR GENERATED ALWAYS AS (
+    to_tsvector(
+        'english',
+        regexp_replace("url", '[^[:alnum:]]+', ' ', 'g') || ' ' || "summary"
+    )
+) STORED;
+        CREATE INDEX "idx_textsummary_search_vector" ON "textsummary" USING GIN ("search_vector");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX "idx_textsummary_search_vector";
+        ALTER TABLE "textsummary" DROP COLUMN "search_vector";"""
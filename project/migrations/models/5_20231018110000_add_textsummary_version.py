@@ -0,0 +1,14 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "textsummary" ADD "updated_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP;
+        ALTER TABLE "textsummary" ADD "version" INT NOT NULL  DEFAULT 1;
+        UPDATE "textsummary" SET "updated_at" = "created_at";"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "textsummary" DROP COLUMN "version";
+        ALTER TABLE "textsummary" DROP COLUMN "updated_at";"""
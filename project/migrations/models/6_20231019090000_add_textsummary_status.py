@@ -0,0 +1,15 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "textsummary" ADD "status" VARCHAR(7) NOT NULL  DEFAULT 'pending';
+        ALTER TABLE "textsummary" ADD "error" TEXT;
+COMMENT ON COLUMN "textsummary"."status" IS 'PENDING: pending\\nRUNNING: running\\nDONE: done\\nFAILED: failed';
+        UPDATE "textsummary" SET "status" = 'done' WHERE "summary" <> '';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "textsummary" DROP COLUMN "error";
+        ALTER TABLE "textsummary" DROP COLUMN "status";"""
@@ -0,0 +1,98 @@
+from tortoise import BaseDBAsyncClient
+
+# Partition bounds are UTC month starts, named like app.maintenance does.
+_CREATE_PARTITIONS = """
+DO $$
+DECLARE
+    month DATE := date_trunc(
+        'month',
+        COALESCE((SELECT min("created_at") FROM "textsummary_unpartitioned"), now())
+        AT TIME ZONE 'UTC'
+    );
+    last DATE := date_trunc('month', now() AT TIME ZONE 'UTC') + INTERVAL '3 months';
+BEGIN
+    WHILE month <= last LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF "textsummary" FOR VALUES FROM (%L) TO (%L)',
+            'textsummary_p' || to_char(month, 'YYYYMM'),
+            month::text || ' 00:00:00+00',
+            (month + INTERVAL '1 month')::date::text || ' 00:00:00+00'
+        );
+        month := month + INTERVAL '1 month';
+    END LOOP;
+END $$;"""
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return (
+        """
+        ALTER TABLE "textsummary" RENAME TO "textsummary_unpartitioned";
+ALTER TABLE "textsummary_unpartitioned" RENAME CONSTRAINT "textsummary_pkey" TO "textsummary_unpartitioned_pkey";
+        ALTER SEQUENCE "textsummary_id_seq" OWNED BY NONE;
+        CREATE TABLE "textsummary" (
+    "id" INT NOT NULL  DEFAULT nextval('textsummary_id_seq'),
+    "url" TEXT NOT NULL,
+    "summary" TEXT NOT NULL,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "url_hash" VARCHAR(64),
+    "search_vector" TSVECTOR GENERATED ALWAYS AS (
+        to_tsvector(
+            'english',
+            regexp_replace("url", '[^[:alnum:]]+', ' ', 'g') || ' ' || "summary"
+        )
+    ) STORED,
+    "updated_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "version" INT NOT NULL  DEFAULT 1,
+    "status" VARCHAR(7) NOT NULL  DEFAULT 'pending',
+    "error" TEXT,
+    PRIMARY KEY ("id", "created_at")
+) PARTITION BY RANGE ("created_at");
+        ALTER SEQUENCE "textsummary_id_seq" OWNED BY "textsummary"."id";"""
+        + _CREATE_PARTITIONS
+        + """
+        INSERT INTO "textsummary" (
+    "id", "url", "summary", "created_at", "url_hash", "updated_at", "version", "status", "error"
+)
+SELECT "id", "url", "summary", "created_at", "url_hash", "updated_at", "version", "status", "error"
+FROM "textsummary_unpartitioned";
+        DROP TABLE "textsummary_unpartitioned";
+        CREATE INDEX "idx_textsummary_url_has_5b3f3c" ON "textsummary" ("url_hash");
+        CREATE INDEX "idx_textsummary_created_4c0a0e" ON "textsummary" ("created_at");
+        CREATE INDEX "idx_textsummary_search_vector" ON "textsummary" USING GIN ("search_vector");
+COMMENT ON COLUMN "textsummary"."status" IS 'PENDING: pending\\nRUNNING: running\\nDONE: done\\nFAILED: failed';"""
+    )
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "textsummary" RENAME TO "textsummary_partitioned";
+ALTER TABLE "textsummary_partitioned" RENAME CONSTRAINT "textsummary_pkey" TO "textsummary_partitioned_pkey";
+        ALTER SEQUENCE "textsummary_id_seq" OWNED BY NONE;
+        CREATE TABLE "textsummary" (
+    "id" INT NOT NULL  DEFAULT nextval('textsummary_id_seq') PRIMARY KEY,
+    "url" TEXT NOT NULL,
+    "summary" TEXT NOT NULL,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "url_hash" VARCHAR(64),
+    "search_vector" TSVECTOR GENERATED ALWAYS AS (
+        to_tsvector(
+            'english',
+            regexp_replace("url", '[^[:alnum:]]+', ' ', 'g') || ' ' || "summary"
+        )
+    ) STORED,
+    "updated_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "version" INT NOT NULL  DEFAULT 1,
+    "status" VARCHAR(7) NOT NULL  DEFAULT 'pending',
+    "error" TEXT
+);
+        ALTER SEQUENCE "textsummary_id_seq" OWNED BY "textsummary"."id";
+        INSERT INTO "textsummary" (
+    "id", "url", "summary", "created_at", "url_hash", "updated_at", "version", "status", "error"
+)
+SELECT "id", "url", "summary", "created_at", "url_hash", "updated_at", "version", "status", "error"
+FROM "textsummary_partitioned";
+        DROP TABLE "textsummary_partitioned";
+        CREATE INDEX "idx_textsummary_url_has_5b3f3c" ON "textsummary" ("url_hash");
+        CREATE INDEX "idx_textsummary_created_4c0a0e" ON "textsummary" ("created_at");
+        CREATE INDEX "idx_textsummary_search_vector" ON "textsummary" USING GIN ("search_vector");
+COMMENT ON COLUMN "textsummary"."status" IS 'PENDING: pending\\nRUNNING: running\\nDONE: done\\nFAILED: failed';"""
@@ -0,0 +1,17 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE "textsummary_default" PARTITION OF "textsummary" DEFAULT;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM "textsummary_default") THEN
+        RAISE EXCEPTION 'textsummary_default has rows; create their partitions first';
+    END IF;
+END $$;
+        DROP TABLE "textsummary_default";"""
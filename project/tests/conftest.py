@@ -1,15 +1,22 @@
+import asyncio
 import os
 
 import pytest
 from fastapi.testclient import TestClient
+from tortoise import Tortoise
 from tortoise.contrib.fastapi import register_tortoise
 
 from app.config import Settings, get_settings
+from app.db import add_search_vector
 from app.main import create_application
 
 
 def get_settings_override():
-    return Settings(testing=1, databese_url=os.environ.get("DATABASE_TEST_URL"))
+    return Settings(
+        testing=1,
+        databese_url=os.environ.get("DATABASE_TEST_URL"),
+        summary_queue="background",
+    )
 
 
 @pytest.fixture(scope="module")
@@ -36,8 +43,71 @@ def test_app_with_db():
         generate_schemas=True,
         add_exception_handlers=True,
     )
+
+    @app.on_event("startup")
+    async def create_search_vector():
+        await add_search_vector(Tortoise.get_connection("default"))
+
     with TestClient(app) as test_client:
         # testing
         yield test_client
 
     # tear down
+
+
+@pytest.fixture
+def override_settings(test_app):
+    """Change settings seen by routes of ``test_app`` for a single test."""
+    overrides = test_app.app.dependency_overrides
+    default_override = overrides[get_settings]
+
+    def override(**values):
+        settings = default_override().copy(update=values)
+        overrides[get_settings] = lambda: settings
+
+    yield override
+    overrides[get_settings] = default_override
+
+
+@pytest.fixture
+def query_counter(monkeypatch):
+    """Count database round trips made through the default connection."""
+    queries = []
+    client_class = type(Tortoise.get_connection("default"))
+
+    for name in (
+        "execute_insert",
+        "execute_many",
+        "execute_query",
+        "execute_query_dict",
+        "execute_script",
+    ):
+        method = getattr(client_class, name)
+
+        def counted(self, query, *args, _method=method, **kwargs):
+            queries.append(query)
+            return _method(self, query, *args, **kwargs)
+
+        monkeypatch.setattr(client_class, name, counted)
+
+    return queries
+
+
+@pytest.fixture
+def run_with_db():
+    """Run ``coro_func()`` against a fresh in-memory SQLite database."""
+
+    def run(coro_func):
+        async def runner():
+            await Tortoise.init(
+                db_url="sqlite://:memory:", modules={"models": ["app.models.tortoise"]}
+            )
+            await Tortoise.generate_schemas()
+            try:
+                return await coro_func()
+            finally:
+                await Tortoise.close_connections()
+
+        return asyncio.run(runner())
+
+    return run
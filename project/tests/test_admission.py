@@ -0,0 +1,79 @@
+import asyncio
+
+from app.api.admission import AdmissionController, TokenBucketLimiter
+
+
+def test_admission_bounds_in_flight_and_pending():
+    async def scenario():
+        admission = AdmissionController()
+        running, peak = 0, 0
+
+        async def work(release: asyncio.Event):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await release.wait()
+            running -= 1
+
+        assert all(admission.reserve(1, 2, 2) for _ in range(4))
+        assert not admission.reserve(1, 2, 2)
+
+        release = asyncio.Event()
+        tasks = [
+            asyncio.create_task(admission.run(1, 2, work, release)) for _ in range(4)
+        ]
+        await asyncio.sleep(0)
+        assert (admission.in_flight, admission.pending, running) == (2, 2, 2)
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert peak == 2
+        assert (admission.in_flight, admission.pending) == (0, 0)
+        assert admission.reserve(4, 2, 2)
+
+    asyncio.run(scenario())
+
+
+def test_admission_reserves_what_fits():
+    admission = AdmissionController()
+    assert admission.reserve_up_to(3, 2, 2) == 3
+    assert admission.reserve_up_to(3, 2, 2) == 1
+    assert admission.reserve_up_to(3, 2, 2) == 0
+    assert admission.pending == 4
+
+
+def test_admission_cancelled_waiter_gives_back_its_reservation():
+    async def scenario():
+        admission = AdmissionController()
+        release = asyncio.Event()
+        assert admission.reserve(2, 1, 1)
+
+        first = asyncio.create_task(admission.run(1, 1, release.wait))
+        second = asyncio.create_task(admission.run(1, 1, release.wait))
+        await asyncio.sleep(0)
+        second.cancel()
+        await asyncio.sleep(0)
+        assert (admission.in_flight, admission.pending) == (1, 0)
+
+        release.set()
+        await first
+        assert admission.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_token_bucket():
+    now = [0.0]
+    limiter = TokenBucketLimiter(clock=lambda: now[0])
+
+    assert [limiter.acquire("a", 1.0, 2, 10) for _ in range(3)] == [0, 0, 1.0]
+    assert limiter.acquire("b", 1.0, 2, 10) == 0
+
+    now[0] = 0.5
+    assert limiter.acquire("a", 1.0, 2, 10) == 0.5
+    now[0] = 1.5
+    assert limiter.acquire("a", 1.0, 2, 10) == 0
+
+    # Only the most recently seen clients keep their buckets.
+    limiter.acquire("c", 1.0, 2, 2)
+    assert list(limiter._buckets) == ["a", "c"]
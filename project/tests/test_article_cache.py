@@ -0,0 +1,31 @@
+import os
+
+from app.article_cache import ArticleCache, CachedArticle
+
+
+def test_round_trip_is_compressed(tmp_path):
+    cache = ArticleCache(tmp_path, max_bytes=1_000_000)
+    html = "<html>" + "<p>café</p>" * 1000 + "</html>"
+
+    assert cache.get("a") is None
+    cache.put("a", CachedArticle(html, etag='"v1"'))
+
+    assert cache.get("a") == CachedArticle(html, etag='"v1"')
+    assert (tmp_path / "a.html.gz").stat().st_size < len(html) / 10
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ArticleCache(tmp_path, max_bytes=600)
+    articles = {key: CachedArticle(os.urandom(150).hex(), etag=key) for key in "abc"}
+
+    for mtime, key in enumerate("ab"):
+        cache.put(key, articles[key])
+        os.utime(tmp_path / f"{key}.html.gz", (mtime, mtime))
+
+    # Reading "a" makes "b" the least recently used entry.
+    assert cache.get("a") is not None
+    cache.put("c", articles["c"])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == articles["a"]
+    assert cache.get("c") == articles["c"]
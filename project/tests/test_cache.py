@@ -0,0 +1,90 @@
+import asyncio
+
+from app.cache import CacheBackend, LocalCache, SummaryCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SharedBackend(CacheBackend):
+    """Stand-in for an external cache shared between processes."""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ttl):
+        self.store[key] = value
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+
+
+def test_local_cache_ttl_and_lru():
+    async def scenario():
+        clock = FakeClock()
+        cache = LocalCache(maxsize=2, clock=clock)
+
+        await cache.set("a", {"id": 1}, ttl=10)
+        await cache.set("b", {"id": 2}, ttl=10)
+        assert await cache.get("a") == {"id": 1}
+
+        await cache.set("c", {"id": 3}, ttl=10)
+        assert len(cache) == 2
+        assert await cache.get("b") is None
+        assert await cache.get("a") == {"id": 1}
+
+        clock.now = 10
+        assert await cache.get("a") is None
+        assert await cache.get("c") is None
+
+    asyncio.run(scenario())
+
+
+def test_summary_cache_read_through():
+    loads = []
+
+    async def loader(id):
+        loads.append(id)
+        return {"id": id, "summary": f"summary {len(loads)}"} if id < 100 else None
+
+    async def scenario():
+        backend = SharedBackend()
+        cache = SummaryCache(backend, ttl=5)
+
+        assert await cache.get_or_load(1, loader) == {"id": 1, "summary": "summary 1"}
+        assert await cache.get_or_load(1, loader) == {"id": 1, "summary": "summary 1"}
+        assert "summary:1" in backend.store
+
+        await cache.invalidate(1)
+        assert await cache.get_or_load(1, loader) == {"id": 1, "summary": "summary 2"}
+
+        assert await cache.get_or_load(999, loader) is None
+        assert await cache.get_or_load(999, loader) is None
+        assert cache.stats() == {"hits": 1, "misses": 4}
+
+    asyncio.run(scenario())
+    assert loads == [1, 1, 999, 999]
+
+
+def test_summary_cache_disabled():
+    loads = []
+
+    async def loader(id):
+        loads.append(id)
+        return {"id": id}
+
+    async def scenario():
+        cache = SummaryCache(SharedBackend(), ttl=0)
+        await cache.get_or_load(1, loader)
+        await cache.get_or_load(1, loader)
+
+    asyncio.run(scenario())
+    assert loads == [1, 1]
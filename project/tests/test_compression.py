@@ -0,0 +1,81 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app import compression
+from app.compression import CompressionMiddleware, choose_encoding
+
+BODY = "summary " * 500
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse(BODY)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([BODY, "ok"]), media_type="text/plain")
+
+    @app.get("/events")
+    def events():
+        return StreamingResponse(iter([BODY]), media_type="text/event-stream")
+
+    @app.get("/encoded")
+    def encoded():
+        return PlainTextResponse(BODY, headers={"Content-Encoding": "identity"})
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, encoding",
+    [
+        ("gzip, deflate", "gzip"),
+        ("GZIP;q=0.5", "gzip"),
+        ("*", "gzip"),
+        ("gzip;q=0, *", None),
+        ("identity", None),
+        ("", None),
+        ("br", None),
+    ],
+)
+def test_choose_encoding_without_brotli(monkeypatch, accept_encoding, encoding):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding(accept_encoding, ["br", "gzip"]) == encoding
+
+
+def test_compresses_large_responses(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(BODY)
+    assert response.text == BODY
+
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BODY + "ok"
+
+
+@pytest.mark.parametrize(
+    "path, accept_encoding",
+    [
+        ("/small", "gzip"),
+        ("/large", "identity"),
+        ("/events", "gzip"),
+        ("/encoded", "gzip"),
+    ],
+)
+def test_sends_uncompressed(client, path, accept_encoding):
+    response = client.get(path, headers={"Accept-Encoding": accept_encoding})
+    assert response.headers.get("content-encoding") in (None, "identity")
+    assert response.text in (BODY, "ok")
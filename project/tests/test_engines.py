@@ -0,0 +1,54 @@
+import re
+
+import pytest
+
+from app import engines
+
+TITLE = "Harbour tunnel opens to traffic"
+TEXT = " ".join(
+    [
+        "The harbour tunnel opened to traffic on Friday after four years of work.",
+        "Crews worked through the night to finish the road markings.",
+        "The tunnel carries traffic under the harbour in about three minutes.",
+        "A local bakery sold commemorative pastries shaped like hard hats.",
+        "Officials expect the tunnel to cut harbour crossing times at peak hours.",
+        "Weather on opening day was mild with light winds.",
+        "Toll charges for the tunnel will be reviewed after the first year.",
+        "Some residents near the entrance complained about construction noise.",
+    ]
+)
+
+
+@pytest.fixture(autouse=True)
+def split_sentences(monkeypatch):
+    # Avoid depending on the NLTK punkt data in unit tests.
+    monkeypatch.setattr(
+        engines.nlp, "split_sentences", lambda text: re.split(r"(?<=\.) ", text)
+    )
+
+
+def test_get_engine():
+    assert engines.get_engine("textrank") is engines.get_engine("textrank")
+    with pytest.raises(ValueError):
+        engines.get_engine("invalid")
+
+
+def test_textrank_keeps_central_sentences_in_order():
+    sentences = engines.nlp.split_sentences(TEXT)
+    summary = engines.get_engine("textrank").summarize(TITLE, TEXT).split("\n")
+
+    assert len(summary) == engines.MAX_SENTENCES
+    assert summary == [sentence for sentence in sentences if sentence in summary]
+    assert sentences[0] in summary
+    assert "A local bakery sold commemorative pastries" not in "\n".join(summary)
+
+
+def test_textrank_short_and_batched_articles():
+    engine = engines.get_engine("textrank")
+    short = "The tunnel opened on Friday. It took four years."
+
+    assert engine.summarize(TITLE, short) == short.replace(". ", ".\n")
+    assert engine.summarize_many([(TITLE, TEXT), (TITLE, short)]) == [
+        engine.summarize(TITLE, TEXT),
+        engine.summarize(TITLE, short),
+    ]
@@ -0,0 +1,98 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app import article_cache, fetcher
+
+
+def run_with_transport(handler, coro_func):
+    async def runner():
+        fetcher.init_client(transport=httpx.MockTransport(handler))
+        try:
+            return await coro_func()
+        finally:
+            await fetcher.close_client()
+
+    return asyncio.run(runner())
+
+
+def test_fetch():
+    def handler(request):
+        assert request.headers["User-Agent"] == fetcher.USER_AGENT
+        return httpx.Response(200, html="<html><p>café</p></html>")
+
+    html = run_with_transport(handler, lambda: fetcher.fetch("https://foo.bar"))
+    assert html == "<html><p>café</p></html>"
+
+
+def test_fetch_http_error():
+    def handler(request):
+        return httpx.Response(404)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run_with_transport(handler, lambda: fetcher.fetch("https://foo.bar"))
+
+
+def test_fetch_too_large(monkeypatch):
+    monkeypatch.setattr(fetcher.get_settings(), "fetch_max_bytes", 10)
+
+    def handler(request):
+        return httpx.Response(200, content=b"x" * 11)
+
+    with pytest.raises(fetcher.FetchError):
+        run_with_transport(handler, lambda: fetcher.fetch("https://foo.bar"))
+
+    async def chunks():
+        yield b"x" * 6
+        yield b"x" * 6
+
+    def streaming_handler(request):
+        return httpx.Response(200, content=chunks())
+
+    with pytest.raises(fetcher.FetchError):
+        run_with_transport(streaming_handler, lambda: fetcher.fetch("https://foo.bar"))
+
+
+def test_fetch_per_host_limit(monkeypatch):
+    monkeypatch.setattr(fetcher.get_settings(), "fetch_per_host_limit", 2)
+    active = {"foo.bar": 0, "baz.qux": 0}
+    peak = {"foo.bar": 0, "baz.qux": 0}
+
+    async def handler(request):
+        host = request.url.host
+        active[host] += 1
+        peak[host] = max(peak[host], active[host])
+        await asyncio.sleep(0.01)
+        active[host] -= 1
+        return httpx.Response(200, text="ok")
+
+    async def fetch_many():
+        urls = [f"https://{host}/{i}" for host in active for i in range(5)]
+        return await asyncio.gather(*(fetcher.fetch(url) for url in urls))
+
+    assert run_with_transport(handler, fetch_many) == ["ok"] * 10
+    assert peak == {"foo.bar": 2, "baz.qux": 2}
+
+
+def test_fetch_revalidates_cached_article(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetcher.get_settings(), "article_cache_dir", str(tmp_path))
+    article_cache.reset_article_cache()
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, html="<html>v1</html>", headers={"ETag": '"v1"'})
+
+    async def fetch_twice():
+        return [await fetcher.fetch("https://foo.bar/a?utm_source=x") for _ in "ab"]
+
+    try:
+        assert run_with_transport(handler, fetch_twice) == ["<html>v1</html>"] * 2
+    finally:
+        article_cache.reset_article_cache()
+
+    assert "If-None-Match" not in requests[0].headers
+    assert requests[1].headers["If-None-Match"] == '"v1"'
@@ -0,0 +1,86 @@
+from app import jobs
+
+from app.models.tortoise import (  # isort: skip
+    JobStatus,
+    SummaryJob,
+    SummaryStatus,
+    TextSummary,
+)
+
+
+def test_claim_complete(run_with_db):
+    async def scenario():
+        job_id = await jobs.enqueue(1, "https://foo.bar")
+
+        job = await jobs.claim()
+        assert job.id == job_id
+        assert job.status == JobStatus.RUNNING
+        assert job.attempts == 1
+        assert job.locked_until is not None
+        assert await jobs.claim() is None
+
+        await jobs.complete(job)
+        job = await SummaryJob.get(id=job_id)
+        assert job.status == JobStatus.DONE
+
+    run_with_db(scenario)
+
+
+def test_fail_retries_then_gives_up(run_with_db, monkeypatch):
+    monkeypatch.setattr(jobs.get_settings(), "job_retry_delay", 0)
+
+    async def scenario():
+        job_id = await jobs.enqueue(1, "https://foo.bar")
+
+        for attempt in range(1, jobs.get_settings().job_max_attempts + 1):
+            job = await jobs.claim()
+            assert job.id == job_id
+            assert job.attempts == attempt
+            await jobs.fail(job, "boom")
+
+        job = await SummaryJob.get(id=job_id)
+        assert job.status == JobStatus.FAILED
+        assert job.last_error == "boom"
+        assert await jobs.claim() is None
+
+    run_with_db(scenario)
+
+
+def test_expired_claim_is_reclaimed(run_with_db, monkeypatch):
+    monkeypatch.setattr(jobs.get_settings(), "job_visibility_timeout", -1)
+
+    async def scenario():
+        job_id = await jobs.enqueue(1, "https://foo.bar")
+        await jobs.claim()
+
+        job = await jobs.claim()
+        assert job.id == job_id
+        assert job.attempts == 2
+
+    run_with_db(scenario)
+
+
+def test_expired_claim_out_of_attempts_fails_summary(run_with_db, monkeypatch):
+    monkeypatch.setattr(jobs.get_settings(), "job_visibility_timeout", -1)
+    monkeypatch.setattr(jobs.get_settings(), "job_max_attempts", 1)
+    published = []
+
+    async def mock_publish(summary_id, status):
+        published.append((summary_id, status))
+
+    monkeypatch.setattr(jobs.notifier, "publish", mock_publish)
+
+    async def scenario():
+        summary = await TextSummary.create(url="https://foo.bar", summary="")
+        job_id = await jobs.enqueue(summary.id, summary.url)
+        await jobs.claim()
+
+        assert await jobs.claim() is None
+        assert (await SummaryJob.get(id=job_id)).status == JobStatus.FAILED
+        summary = await TextSummary.get(id=summary.id)
+        assert summary.status == SummaryStatus.FAILED
+        assert summary.error == jobs.EXPIRED_ERROR
+        assert summary.version == 2
+        assert published == [(summary.id, "failed")]
+
+    run_with_db(scenario)
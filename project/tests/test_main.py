@@ -0,0 +1,53 @@
+import subprocess
+import sys
+
+import nltk
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+
+
+def test_lifespan_initializes_and_closes_db(monkeypatch):
+    calls = []
+
+    async def mock_init_db():
+        calls.append("init_db")
+
+    async def mock_close_db():
+        calls.append("close_db")
+
+    monkeypatch.setattr(main, "init_db", mock_init_db)
+    monkeypatch.setattr(main, "close_db", mock_close_db)
+    monkeypatch.setattr(main.get_settings(), "summarizer_warmup", False)
+
+    with TestClient(main.app) as client:
+        assert client.get("/ping").status_code == 200
+        assert calls == ["init_db"]
+
+    assert calls == ["init_db", "close_db"]
+
+
+def test_lifespan_fails_fast_without_punkt(monkeypatch):
+    def mock_find(resource):
+        raise LookupError(resource)
+
+    async def mock_init_db():
+        raise AssertionError("startup must stop before the database")
+
+    monkeypatch.setattr(nltk.data, "find", mock_find)
+    monkeypatch.setattr(main, "init_db", mock_init_db)
+    monkeypatch.setattr(main.get_settings(), "summarizer_warmup", True)
+    monkeypatch.setattr(main.get_settings(), "summary_queue", "background")
+
+    with pytest.raises(RuntimeError, match="punkt"):
+        with TestClient(main.app):
+            pass
+
+
+def test_app_import_does_not_load_summarizer_stack():
+    code = "import sys, app.main; print('newspaper' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert output.stdout.strip() == "False"
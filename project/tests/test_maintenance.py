@@ -0,0 +1,100 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app import maintenance
+
+
+def test_month_arithmetic():
+    assert maintenance.add_months(date(2023, 11, 1), 2) == date(2024, 1, 1)
+    assert maintenance.add_months(date(2023, 1, 1), -1) == date(2022, 12, 1)
+
+    # 23:30 on Oct 31 two hours west of UTC is already November in UTC.
+    moment = datetime(2023, 10, 31, 23, 30, tzinfo=timezone(timedelta(hours=-2)))
+    assert maintenance.month_of(moment) == date(2023, 11, 1)
+
+
+def test_partition_names():
+    assert maintenance.partition_name(date(2023, 7, 1)) == "textsummary_p202307"
+    assert maintenance.partition_month("textsummary_p202307") == date(2023, 7, 1)
+    assert maintenance.partition_month("textsummary_unpartitioned") is None
+    assert maintenance.partition_month("textsummary_default") is None
+
+
+def test_plan_creates_upcoming_and_expires_old_partitions():
+    existing = [
+        "textsummary_p202307",
+        "textsummary_p202308",
+        "textsummary_p202309",
+        "textsummary_p202310",
+        "textsummary_p202311",
+        "textsummary_archive",
+    ]
+    now = datetime(2023, 10, 15, tzinfo=timezone.utc)
+
+    missing, expired = maintenance.plan(existing, now, premake=2, retention=3)
+    assert missing == [date(2023, 12, 1)]
+    assert expired == ["textsummary_p202307"]
+
+    _, expired = maintenance.plan(existing, now, premake=2, retention=0)
+    assert expired == []
+
+
+def test_maintain_skips_non_postgres_databases(run_with_db):
+    run_with_db(maintenance.maintain)
+
+
+class MockConnection:
+    def __init__(self, partitions):
+        self.partitions = partitions
+        self.scripts = []
+
+    async def execute_query_dict(self, query, values=None):
+        return [{"name": name} for name in self.partitions]
+
+    async def execute_script(self, script):
+        self.scripts.append(script)
+
+
+@pytest.fixture
+def postgres(monkeypatch):
+    connection = MockConnection(
+        ["textsummary_default", "textsummary_p202307", "textsummary_p202310"]
+    )
+    monkeypatch.setattr(maintenance, "AsyncpgDBClient", MockConnection)
+    monkeypatch.setattr(maintenance.connections, "get", lambda name: connection)
+    settings = maintenance.get_settings()
+    monkeypatch.setattr(settings, "partition_premake_months", 0)
+    monkeypatch.setattr(settings, "partition_retention_months", 2)
+    monkeypatch.setattr(settings, "partition_archive_dir", "")
+    return connection
+
+
+def test_maintain_refuses_to_drop_without_archive(postgres):
+    now = datetime(2023, 10, 15, tzinfo=timezone.utc)
+
+    with pytest.raises(RuntimeError, match="--no-archive"):
+        asyncio.run(maintenance.maintain(now))
+    assert not any("DROP TABLE" in script for script in postgres.scripts)
+
+    asyncio.run(maintenance.maintain(now, archive=False))
+    assert postgres.scripts[-1] == (
+        'ALTER TABLE "textsummary" DETACH PARTITION "textsummary_p202307"; '
+        'DROP TABLE "textsummary_p202307"'
+    )
+
+
+def test_create_partition_moves_rows_out_of_default_partition():
+    connection = MockConnection([])
+    asyncio.run(maintenance.create_partition(connection, date(2023, 11, 1)))
+
+    [script] = connection.scripts
+    assert script.startswith("BEGIN;")
+    assert 'DETACH PARTITION "textsummary_default"' in script
+    assert 'INSERT INTO "textsummary_p202311"' in script
+    assert 'ATTACH PARTITION "textsummary_default" DEFAULT' in script
+
+    connection = MockConnection([])
+    asyncio.run(maintenance.create_partition(connection, date(2023, 11, 1), False))
+    assert "DEFAULT" not in connection.scripts[0]
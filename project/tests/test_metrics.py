@@ -0,0 +1,84 @@
+import time
+
+from fastapi import BackgroundTasks, FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.metrics import (  # isort: skip
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsMiddleware,
+    Registry,
+    http_request_duration,
+)
+
+
+def test_registry_render():
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests.", ("route",)))
+    in_flight = registry.register(Gauge("in_flight", "In flight."))
+    latency = registry.register(
+        Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+    )
+
+    requests.inc(route='/say "hi"')
+    requests.inc(2, route='/say "hi"')
+    in_flight.inc()
+    in_flight.dec()
+    latency.observe(0.05, route="/")
+    latency.observe(0.5, route="/")
+    latency.observe(5, route="/")
+
+    assert registry.metrics == [requests, in_flight, latency]
+    assert requests.render() == "\n".join(
+        [
+            "# HELP requests_total Requests.",
+            "# TYPE requests_total counter",
+            'requests_total{route="/say \\"hi\\""} 3',
+        ]
+    )
+    assert in_flight.render().endswith("\nin_flight 0")
+    assert latency.render().splitlines()[2:] == [
+        'latency_seconds_bucket{route="/",le="0.1"} 1',
+        'latency_seconds_bucket{route="/",le="1"} 2',
+        'latency_seconds_bucket{route="/",le="+Inf"} 3',
+        'latency_seconds_sum{route="/"} 5.55',
+        'latency_seconds_count{route="/"} 3',
+    ]
+
+
+def test_metrics_endpoint(test_app: TestClient):
+    test_app.get("/ping")
+    test_app.get("/summaries/0/")
+
+    response: Response = test_app.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/ping",status="200"}'
+        in body
+    )
+    assert 'route="/summaries/{id}/"' in body
+    assert "# TYPE summarizer_stage_duration_seconds histogram" in body
+    assert 'http_requests_in_flight{method="GET",route="/ping"} 0' in body
+
+
+def test_request_duration_excludes_background_tasks():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.post("/slow-background")
+    def slow_background(background_tasks: BackgroundTasks):
+        background_tasks.add_task(time.sleep, 0.2)
+        return {}
+
+    TestClient(app).post("/slow-background")
+
+    durations = {
+        name: value
+        for name, labels, _, value in http_request_duration.samples()
+        if labels[1] == "/slow-background"
+    }
+    assert durations["http_request_duration_seconds_count"] == 1
+    assert durations["http_request_duration_seconds_sum"] < 0.2
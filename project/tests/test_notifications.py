@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings
+from app.notifications import SummaryNotifier
+
+
+def test_publish_wakes_every_waiter_of_the_summary():
+    async def scenario():
+        notifier = SummaryNotifier()
+        first, second = notifier.subscribe(1), notifier.subscribe(1)
+        other = notifier.subscribe(2)
+        assert notifier.waiting() == 3
+
+        await notifier.publish(1, "done")
+
+        assert await notifier.wait(1, first, 1) == "done"
+        assert await notifier.wait(1, second, 1) == "done"
+        assert not other.done()
+        assert notifier.waiting() == 1
+
+    asyncio.run(scenario())
+
+
+def test_wait_times_out_without_dropping_the_subscription():
+    async def scenario():
+        notifier = SummaryNotifier()
+        waiter = notifier.subscribe(1)
+
+        assert await notifier.wait(1, waiter, 0.01) is None
+        assert not waiter.cancelled()
+
+        await notifier.publish(1, "failed")
+        assert await notifier.wait(1, waiter, 1) == "failed"
+
+        notifier.unsubscribe(1, waiter)
+        assert notifier.waiting() == 0
+
+    asyncio.run(scenario())
+
+
+def test_database_queue_requires_postgres_notifications():
+    with pytest.raises(ValidationError, match="notify_backend=postgres"):
+        Settings(summary_queue="database", notify_backend="local")
+
+    settings = Settings(summary_queue="database", notify_backend="postgres")
+    assert settings.notify_backend == "postgres"
@@ -0,0 +1,70 @@
+import asyncio
+import cProfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import profiling
+from app.config import get_settings
+from app.main import create_application
+
+
+@pytest.fixture
+def profile_settings(monkeypatch, tmp_path):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profile_token", "secret")
+    monkeypatch.setattr(settings, "profile_sample_rate", 0.0)
+    profiling.reset_profile_ring()
+    yield settings
+    profiling.reset_profile_ring()
+
+
+def test_ring_keeps_newest_files(tmp_path):
+    ring = profiling.ProfileRing(tmp_path, max_files=2)
+    paths = []
+    for name in ("a", "b", "c"):
+        profiler = cProfile.Profile()
+        paths.append(ring.path(f"GET /{name}?x=1"))
+        ring.save(profiler, paths[-1])
+
+    assert sorted(tmp_path.glob("*.prof")) == paths[1:]
+    assert paths[0].name.endswith("-GET_a_x_1.prof")
+
+
+def test_middleware_profiles_requests_with_token(profile_settings, tmp_path):
+    client = TestClient(create_application())
+
+    response = client.get("/ping", headers={"X-Profile": "secret"})
+    assert response.status_code == 200
+    assert (tmp_path / response.headers["X-Profile-File"]).exists()
+
+    response = client.get("/ping", params={"profile": "secret"})
+    assert (tmp_path / response.headers["X-Profile-File"]).exists()
+
+    response = client.get("/ping", headers={"X-Profile": "wrong"})
+    assert "X-Profile-File" not in response.headers
+    assert len(list(tmp_path.glob("*.prof"))) == 2
+
+
+def test_middleware_samples_requests(profile_settings, monkeypatch, tmp_path):
+    monkeypatch.setattr(profile_settings, "profile_sample_rate", 1.0)
+    client = TestClient(create_application())
+
+    response = client.get("/ping")
+    assert "X-Profile-File" not in response.headers
+    assert len(list(tmp_path.glob("*.prof"))) == 1
+
+
+def test_profile_runs_one_block_at_a_time(profile_settings, tmp_path):
+    async def scenario():
+        async with profiling.profile("outer") as outer:
+            async with profiling.profile("inner") as inner:
+                pass
+        async with profiling.profile("skipped", enabled=False) as skipped:
+            pass
+        return outer, inner, skipped
+
+    outer, inner, skipped = asyncio.run(scenario())
+    assert inner is None and skipped is None
+    assert [path.name for path in tmp_path.glob("*.prof")] == [outer]
@@ -1,14 +1,17 @@
+import json
+
 import pytest
 from fastapi import Response
 from fastapi.testclient import TestClient
 
 from app.api import summaries
+from app.config import get_settings
 
 SUMMARIES_ENDPOINT = "/summaries"
 
 
 def test_create_summary(test_app_with_db: TestClient, monkeypatch):
-    def mock_generate_summary(summary_id, url):
+    async def mock_generate_summary(summary_id, url):
         return None
 
     monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
@@ -21,6 +24,140 @@ def test_create_summary(test_app_with_db: TestClient, monkeypatch):
     assert response.json()["url"] == "https://foo.bar"
 
 
+def test_create_summary_reuses_recent_url(test_app_with_db: TestClient, monkeypatch):
+    scheduled = []
+
+    async def mock_generate_summary(summary_id, url):
+        scheduled.append(summary_id)
+
+    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
+
+    response: Response = test_app_with_db.post(
+        SUMMARIES_ENDPOINT, json={"url": "https://dedup.foo.bar/article"}
+    )
+    summary_id = response.json()["id"]
+
+    response = test_app_with_db.post(
+        SUMMARIES_ENDPOINT,
+        json={"url": "HTTPS://Dedup.foo.bar/article/?utm_source=feed"},
+    )
+    assert response.status_code == 201
+    assert response.json()["id"] == summary_id
+    assert scheduled == [summary_id]
+
+
+def test_create_summary_skips_stale_in_flight_url(
+    test_app_with_db: TestClient, monkeypatch
+):
+    async def mock_generate_summary(summary_id, url):
+        return None
+
+    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
+    monkeypatch.setattr(get_settings(), "job_visibility_timeout", -1)
+    url = "https://stale.foo.bar/article"
+
+    pending_id = test_app_with_db.post(SUMMARIES_ENDPOINT, json={"url": url}).json()[
+        "id"
+    ]
+    response = test_app_with_db.post(SUMMARIES_ENDPOINT, json={"url": url})
+    assert response.json()["id"] != pending_id
+
+    done_id = response.json()["id"]
+    test_app_with_db.put(
+        f"{SUMMARIES_ENDPOINT}/{done_id}/", json={"url": url, "summary": "done"}
+    )
+    response = test_app_with_db.post(SUMMARIES_ENDPOINT, json={"url": url})
+    assert response.json()["id"] == done_id
+
+
+def test_create_summaries_batch_enqueue_failure_rolls_back(
+    test_app_with_db: TestClient, monkeypatch
+):
+    async def mock_enqueue_many(items, connection=None):
+        raise RuntimeError("queue is down")
+
+    monkeypatch.setattr(summaries.jobs, "enqueue_many", mock_enqueue_many)
+    overrides = test_app_with_db.app.dependency_overrides
+    default_override = overrides[get_settings]
+    settings = default_override().copy(update={"summary_queue": "database"})
+    overrides[get_settings] = lambda: settings
+    try:
+        with pytest.raises(RuntimeError):
+            test_app_with_db.post(
+                f"{SUMMARIES_ENDPOINT}/batch",
+                json=[{"url": "https://rollback.foo.bar/1"}],
+            )
+    finally:
+        overrides[get_settings] = default_override
+
+    response = test_app_with_db.get(
+        SUMMARIES_ENDPOINT, params={"url": "https://rollback.foo.bar/1"}
+    )
+    assert response.json()["items"] == []
+
+
+def test_create_summaries_batch(test_app_with_db: TestClient, monkeypatch):
+    scheduled = []
+
+    async def mock_generate_summary(summary_id, url):
+        return None
+
+    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
+
+    async def mock_generate_summaries(items, max_in_flight=None):
+        scheduled.extend(items)
+
+    monkeypatch.setattr(summaries, "generate_summaries", mock_generate_summaries)
+
+    response: Response = test_app_with_db.post(
+        SUMMARIES_ENDPOINT, json={"url": "https://batch.foo.bar/existing"}
+    )
+    existing_id = response.json()["id"]
+
+    response = test_app_with_db.post(
+        f"{SUMMARIES_ENDPOINT}/batch",
+        json=[
+            {"url": "https://batch.foo.bar/1"},
+            {"url": "invalid://url"},
+            {"url": "https://batch.foo.bar/existing/"},
+            {},
+            {"url": "https://batch.foo.bar/2"},
+            {"url": "https://BATCH.foo.bar/1"},
+            "https://batch.foo.bar/3",
+            None,
+        ],
+    )
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["index"] for item in items] == list(range(8))
+
+    assert items[1]["id"] is None
+    assert items[1]["errors"][0]["msg"] == "URL scheme not permitted"
+    assert items[3]["errors"][0]["msg"] == "field required"
+    assert items[6]["id"] is None and items[6]["errors"]
+    assert items[7]["id"] is None and items[7]["errors"]
+    assert items[2]["id"] == existing_id
+    assert items[5]["id"] == items[0]["id"]
+    assert items[0]["id"] < items[4]["id"]
+    assert scheduled == [
+        (items[0]["id"], "https://batch.foo.bar/1"),
+        (items[4]["id"], "https://batch.foo.bar/2"),
+    ]
+
+    for item in (items[0], items[4]):
+        response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/{item['id']}/")
+        assert response.status_code == 200
+        assert response.json()["url"] == item["url"]
+
+
+def test_create_summaries_batch_too_large(test_app: TestClient):
+    response: Response = test_app.post(
+        f"{SUMMARIES_ENDPOINT}/batch", json=[{"url": "https://foo.bar"}] * 1001
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Batch exceeds 1000 items"
+
+
 def test_create_summary_invalid_json(
     test_app: TestClient, test_app_with_db: TestClient
 ):
@@ -42,7 +179,7 @@ def test_create_summary_invalid_json(
 
 
 def test_read_summary(test_app_with_db: TestClient, monkeypatch):
-    def mock_generate_summary(summary_id, url):
+    async def mock_generate_summary(summary_id, url):
         return None
 
     monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
@@ -62,6 +199,107 @@ def test_read_summary(test_app_with_db: TestClient, monkeypatch):
     assert response_dict["created_at"]
 
 
+def test_read_summaries_fields_projection(
+    test_app_with_db: TestClient, query_counter: list, monkeypatch
+):
+    async def mock_generate_summary(summary_id, url):
+        return None
+
+    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
+
+    response: Response = test_app_with_db.post(
+        SUMMARIES_ENDPOINT, json={"url": "https://fields.foo.bar"}
+    )
+    summary_id = response.json()["id"]
+    summary_url = f"{SUMMARIES_ENDPOINT}/{summary_id}/"
+
+    query_counter.clear()
+    response = test_app_with_db.get(summary_url, params={"fields": "url, status"})
+    assert response.status_code == 200
+    assert response.json() == {
+        "id": summary_id,
+        "url": "https://fields.foo.bar",
+        "status": "pending",
+    }
+    assert response.headers["etag"] == f'"{summary_id}-1-id-url-status"'
+    assert not any('"summary"' in query for query in query_counter)
+
+    query_counter.clear()
+    response = test_app_with_db.get(
+        SUMMARIES_ENDPOINT, params={"fields": "url", "url": "https://fields.foo.bar"}
+    )
+    assert response.json()["items"] == [
+        {"id": summary_id, "url": "https://fields.foo.bar"}
+    ]
+    assert not any('"summary"' in query for query in query_counter)
+
+    response = test_app_with_db.get(summary_url, params={"fields": "url,secret"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Unknown fields: secret"
+
+
+def test_read_summary_conditional(
+    test_app_with_db: TestClient, query_counter: list, monkeypatch
+):
+    async def mock_generate_summary(summary_id, url):
+        return None
+
+    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
+
+    response: Response = test_app_with_db.post(
+        SUMMARIES_ENDPOINT, json={"url": "https://conditional.foo.bar"}
+    )
+    summary_id = response.json()["id"]
+    summary_url = f"{SUMMARIES_ENDPOINT}/{summary_id}/"
+
+    response = test_app_with_db.get(summary_url)
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+    assert etag == f'"{summary_id}-1"'
+    assert "version" not in response.json()
+
+    query_counter.clear()
+    response = test_app_with_db.get(summary_url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert not any('"summary"' in query for query in query_counter)
+
+    response = test_app_with_db.get(
+        summary_url, headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
+
+    response = test_app_with_db.get(
+        f"{SUMMARIES_ENDPOINT}/999999/", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 404
+
+    test_app_with_db.put(
+        summary_url, json={"url": "https://conditional.foo.bar", "summary": "new"}
+    )
+    response = test_app_with_db.get(summary_url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"{summary_id}-2"'
+    assert response.json()["summary"] == "new"
+
+
+def test_read_all_summaries_conditional(test_app_with_db: TestClient):
+    response: Response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/?limit=5")
+    etag = response.headers["etag"]
+    assert "version" not in response.json()["items"][0]
+
+    response = test_app_with_db.get(
+        f"{SUMMARIES_ENDPOINT}/?limit=5", headers={"If-None-Match": f"W/{etag}"}
+    )
+    assert response.status_code == 304
+
+    response = test_app_with_db.get(
+        f"{SUMMARIES_ENDPOINT}/?limit=4", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+
 def test_read_summary_incorrect_id(test_app_with_db: TestClient):
     response: Response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/999/")
     assert response.status_code == 404
@@ -82,7 +320,7 @@ def test_read_summary_incorrect_id(test_app_with_db: TestClient):
 
 
 def test_real_all_summaries(test_app_with_db: TestClient, monkeypatch):
-    def mock_generate_summary(summary_id, url):
+    async def mock_generate_summary(summary_id, url):
         return None
 
     monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
@@ -92,15 +330,134 @@ def test_real_all_summaries(test_app_with_db: TestClient, monkeypatch):
     )
     summary_id = response.json()["id"]
 
-    response = test_app_with_db.get(SUMMARIES_ENDPOINT)
+    response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/?limit=100")
     assert response.status_code == 200
 
-    response_list = response.json()
+    response_list = response.json()["items"]
     assert len(list(filter(lambda d: d["id"] == summary_id, response_list))) == 1
 
 
+def test_read_all_summaries_paginated(test_app_with_db: TestClient, monkeypatch):
+    async def mock_generate_summary(summary_id, url):
+        return None
+
+    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
+
+    created_ids = []
+    for page in range(3):
+        response: Response = test_app_with_db.post(
+            SUMMARIES_ENDPOINT, json={"url": f"https://paginated.foo.bar/{page}"}
+        )
+        created_ids.append(response.json()["id"])
+
+    seen_ids = []
+    cursor = None
+    while True:
+        params = {"limit": 2, "cursor": cursor} if cursor else {"limit": 2}
+        response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen_ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen_ids == sorted(seen_ids)
+    assert set(created_ids) <= set(seen_ids)
+
+    response = test_app_with_db.get(
+        f"{SUMMARIES_ENDPOINT}/", params={"url": "https://paginated.foo.bar/1/"}
+    )
+    assert [item["id"] for item in response.json()["items"]] == [created_ids[1]]
+
+
+def test_read_all_summaries_invalid_params(test_app_with_db: TestClient):
+    response: Response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/?limit=0")
+    assert response.status_code == 422
+
+    response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/?limit=101")
+    assert response.status_code == 422
+
+    response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/?cursor=not-a-cursor")
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_export_summaries(test_app_with_db: TestClient, monkeypatch):
+    async def mock_generate_summary(summary_id, url):
+        return None
+
+    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
+
+    response: Response = test_app_with_db.post(
+        SUMMARIES_ENDPOINT, json={"url": "https://export.foo.bar"}
+    )
+    summary_id = response.json()["id"]
+
+    response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+    assert summary_id in [row["id"] for row in rows]
+
+    response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/export?gzip=true")
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert [json.loads(line) for line in response.text.splitlines()] == rows
+
+    response = test_app_with_db.get(
+        f"{SUMMARIES_ENDPOINT}/export", params={"created_after": "2999-01-01T00:00"}
+    )
+    assert response.status_code == 200
+    assert response.text == ""
+
+
+def test_search_summaries(test_app_with_db: TestClient, monkeypatch):
+    async def mock_generate_summary(summary_id, url):
+        return None
+
+    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
+
+    summary_ids = []
+    for index, text in enumerate(
+        ["solar farm opens", "bike lanes expand", "solar panels get cheaper"]
+    ):
+        response: Response = test_app_with_db.post(
+            SUMMARIES_ENDPOINT, json={"url": f"https://search.foo.bar/{index}"}
+        )
+        summary_ids.append(response.json()["id"])
+        test_app_with_db.put(
+            f"{SUMMARIES_ENDPOINT}/{summary_ids[-1]}/",
+            json={"url": f"https://search.foo.bar/{index}", "summary": text},
+        )
+
+    response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/search?q=solar")
+    assert response.status_code == 200
+    assert {item["id"] for item in response.json()["items"]} == {
+        summary_ids[0],
+        summary_ids[2],
+    }
+
+    response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/search?q=solar&limit=1")
+    page = response.json()
+    assert len(page["items"]) == 1
+    assert page["next_offset"] == 1
+
+    response = test_app_with_db.get(
+        f"{SUMMARIES_ENDPOINT}/search", params={"q": "solar", "limit": 1, "offset": 1}
+    )
+    page = response.json()
+    assert len(page["items"]) == 1
+    assert page["next_offset"] is None
+
+    response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/search?q=")
+    assert response.status_code == 422
+
+
 def test_remove_summary(test_app_with_db: TestClient, monkeypatch):
-    def mock_generate_summary(summary_id, url):
+    async def mock_generate_summary(summary_id, url):
         return None
 
     monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
@@ -115,6 +472,38 @@ def test_remove_summary(test_app_with_db: TestClient, monkeypatch):
     assert response.json() == {"id": summary_id, "url": "https://foo.bar"}
 
 
+def test_write_round_trips(
+    test_app_with_db: TestClient, query_counter: list, monkeypatch
+):
+    async def mock_generate_summary(summary_id, url):
+        return None
+
+    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
+
+    response: Response = test_app_with_db.post(
+        SUMMARIES_ENDPOINT, json={"url": "https://round-trips.foo.bar"}
+    )
+    summary_id = response.json()["id"]
+
+    query_counter.clear()
+    response = test_app_with_db.put(
+        f"{SUMMARIES_ENDPOINT}/{summary_id}/",
+        json={"url": "https://round-trips.foo.bar", "summary": "updated!"},
+    )
+    assert response.status_code == 200
+    assert len(query_counter) == 1
+
+    query_counter.clear()
+    response = test_app_with_db.delete(f"{SUMMARIES_ENDPOINT}/{summary_id}/")
+    assert response.status_code == 200
+    assert len(query_counter) == 1
+
+    query_counter.clear()
+    response = test_app_with_db.delete(f"{SUMMARIES_ENDPOINT}/{summary_id}/")
+    assert response.status_code == 404
+    assert len(query_counter) == 1
+
+
 def test_remove_summary_incorrect_id(test_app_with_db: TestClient):
     response: Response = test_app_with_db.delete(f"{SUMMARIES_ENDPOINT}/999")
     assert response.status_code == 404
@@ -135,7 +524,7 @@ def test_remove_summary_incorrect_id(test_app_with_db: TestClient):
 
 
 def test_update_summary(test_app_with_db: TestClient, monkeypatch):
-    def mock_generate_summary(summary_id, url):
+    async def mock_generate_summary(summary_id, url):
         return None
 
     monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
@@ -158,6 +547,80 @@ def test_update_summary(test_app_with_db: TestClient, monkeypatch):
     assert response_dict["created_at"]
 
 
+def test_read_summary_after_update(test_app_with_db: TestClient, monkeypatch):
+    async def mock_generate_summary(summary_id, url):
+        return None
+
+    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
+
+    response: Response = test_app_with_db.post(
+        SUMMARIES_ENDPOINT, json={"url": "https://cached.foo.bar"}
+    )
+    summary_id = response.json()["id"]
+
+    stats = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/cache/stats").json()
+    test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/{summary_id}/")
+    response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/{summary_id}/")
+    assert response.json()["summary"] == ""
+    assert test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/cache/stats").json() == {
+        "hits": stats["hits"] + 1,
+        "misses": stats["misses"] + 1,
+    }
+
+    test_app_with_db.put(
+        f"{SUMMARIES_ENDPOINT}/{summary_id}/",
+        json={"url": "https://cached.foo.bar", "summary": "updated!"},
+    )
+    response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/{summary_id}/")
+    assert response.json()["summary"] == "updated!"
+
+    test_app_with_db.delete(f"{SUMMARIES_ENDPOINT}/{summary_id}/")
+    response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/{summary_id}/")
+    assert response.status_code == 404
+
+
+def test_summary_events(test_app_with_db: TestClient, monkeypatch):
+    async def mock_generate_summary(summary_id, url):
+        return None
+
+    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
+    overrides = test_app_with_db.app.dependency_overrides
+    settings = overrides[get_settings]().copy(
+        update={"sse_heartbeat": 0.01, "sse_timeout": 0.05}
+    )
+    monkeypatch.setitem(overrides, get_settings, lambda: settings)
+
+    response: Response = test_app_with_db.post(
+        SUMMARIES_ENDPOINT, json={"url": "https://events.foo.bar"}
+    )
+    summary_id = response.json()["id"]
+    assert (
+        test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/{summary_id}/").json()["status"]
+        == "pending"
+    )
+
+    # A pending summary keeps the stream open with heartbeats until it times out.
+    response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/{summary_id}/events")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith(
+        f'event: status\ndata: {{"id": {summary_id}, "status": "pending"}}\n\n'
+    )
+    assert ": heartbeat\n\n" in response.text
+
+    test_app_with_db.put(
+        f"{SUMMARIES_ENDPOINT}/{summary_id}/",
+        json={"url": "https://events.foo.bar", "summary": "done"},
+    )
+    response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/{summary_id}/events")
+    assert response.text == (
+        f'event: status\ndata: {{"id": {summary_id}, "status": "done"}}\n\n'
+    )
+
+    response = test_app_with_db.get(f"{SUMMARIES_ENDPOINT}/999999/events")
+    assert response.status_code == 404
+
+
 @pytest.mark.parametrize(
     "summary_id, payload, status_code, detail",
     [
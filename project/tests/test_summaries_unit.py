@@ -1,9 +1,11 @@
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 import pytest
 from fastapi import Response
 from fastapi.testclient import TestClient
 
+from app import jobs
 from app.api import crud, summaries
 from tests.test_summaries import SUMMARIES_ENDPOINT
 
@@ -12,11 +14,16 @@ def test_create_summary(test_app: TestClient, monkeypatch):
     test_request_payload = {"url": "https://foo.bar"}
     test_response_payload = {"id": 1, "url": "https://foo.bar"}
 
-    def mock_generate_summary(summary_id, url):
+    async def mock_generate_summary(summary_id, url):
         return None
 
     monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
 
+    async def mock_get_by_url(url):
+        return None
+
+    monkeypatch.setattr(crud, "get_by_url", mock_get_by_url)
+
     async def mock_post(payload):
         return 1
 
@@ -28,6 +35,149 @@ def test_create_summary(test_app: TestClient, monkeypatch):
     assert response.json() == test_response_payload
 
 
+def test_create_summary_enqueues_job(
+    test_app: TestClient, override_settings, monkeypatch
+):
+    enqueued = []
+
+    async def mock_generate_summary(summary_id, url):
+        raise AssertionError("summaries must not run in the API process")
+
+    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
+
+    async def mock_get_by_url(url):
+        return None
+
+    monkeypatch.setattr(crud, "get_by_url", mock_get_by_url)
+
+    async def mock_post(payload, connection=None):
+        return 1
+
+    monkeypatch.setattr(crud, "post", mock_post)
+
+    async def mock_enqueue(summary_id, url, connection=None):
+        enqueued.append((summary_id, url))
+        return 1
+
+    monkeypatch.setattr(jobs, "enqueue", mock_enqueue)
+
+    @asynccontextmanager
+    async def mock_in_transaction(name):
+        yield None
+
+    monkeypatch.setattr(summaries, "in_transaction", mock_in_transaction)
+
+    override_settings(summary_queue="database")
+    response: Response = test_app.post(
+        SUMMARIES_ENDPOINT, json={"url": "https://foo.bar"}
+    )
+
+    assert response.status_code == 201
+    assert enqueued == [(1, "https://foo.bar")]
+
+
+def test_create_summary_admission(test_app: TestClient, override_settings, monkeypatch):
+    async def mock_generate_summary(summary_id, url):
+        return None
+
+    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
+
+    async def mock_get_by_url(url):
+        return None
+
+    monkeypatch.setattr(crud, "get_by_url", mock_get_by_url)
+
+    async def mock_post(payload):
+        raise AssertionError("a rejected summary must not be inserted")
+
+    monkeypatch.setattr(crud, "post", mock_post)
+
+    override_settings(summary_max_in_flight=0, summary_max_pending=0)
+    response: Response = test_app.post(
+        SUMMARIES_ENDPOINT, json={"url": "https://foo.bar"}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+    override_settings(
+        summary_max_in_flight=0,
+        summary_max_pending=0,
+        rate_limit_per_second=0.01,
+        rate_limit_burst=1,
+    )
+    responses = [
+        test_app.post(SUMMARIES_ENDPOINT, json={"url": "https://foo.bar"})
+        for _ in range(2)
+    ]
+    assert [response.status_code for response in responses] == [503, 429]
+    assert int(responses[1].headers["Retry-After"]) > 90
+
+
+def test_create_summary_reuses_existing(test_app: TestClient, monkeypatch):
+    async def mock_generate_summary(summary_id, url):
+        raise AssertionError("an existing summary must not be regenerated")
+
+    monkeypatch.setattr(summaries, "generate_summary", mock_generate_summary)
+
+    async def mock_get_by_url(url):
+        return {
+            "id": 7,
+            "url": "https://foo.bar",
+            "summary": "summary",
+            "created_at": datetime.utcnow().isoformat(),
+        }
+
+    monkeypatch.setattr(crud, "get_by_url", mock_get_by_url)
+
+    async def mock_post(payload):
+        raise AssertionError("an existing summary must not be inserted again")
+
+    monkeypatch.setattr(crud, "post", mock_post)
+
+    response: Response = test_app.post(
+        SUMMARIES_ENDPOINT, json={"url": "https://foo.bar/?utm_source=feed"}
+    )
+
+    assert response.status_code == 201
+    assert response.json() == {"id": 7, "url": "https://foo.bar"}
+
+
+def test_create_summaries_admits_what_fits(
+    test_app: TestClient, override_settings, monkeypatch
+):
+    scheduled = []
+
+    async def mock_get_by_urls(urls):
+        return {}
+
+    async def mock_post_many(urls, connection=None):
+        return list(range(1, len(urls) + 1))
+
+    async def mock_generate_summaries(items, max_in_flight=None):
+        scheduled.append((len(items), max_in_flight))
+
+    monkeypatch.setattr(crud, "get_by_urls", mock_get_by_urls)
+    monkeypatch.setattr(crud, "post_many", mock_post_many)
+    monkeypatch.setattr(summaries, "generate_summaries", mock_generate_summaries)
+
+    override_settings(summary_max_in_flight=2, summary_max_pending=1)
+    payload = [{"url": f"https://foo.bar/{i}"} for i in range(300)]
+    response: Response = test_app.post(f"{SUMMARIES_ENDPOINT}/batch", json=payload)
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["id"] for item in items[:3]] == [1, 2, 3]
+    assert all(item["id"] is None for item in items[3:])
+    assert items[3]["errors"] == [
+        {"msg": "Summarization is at capacity", "type": "capacity"}
+    ]
+    assert scheduled == [(3, 2)]
+
+    override_settings(summary_max_in_flight=0, summary_max_pending=0)
+    response = test_app.post(f"{SUMMARIES_ENDPOINT}/batch", json=payload)
+    assert response.status_code == 503
+
+
 def test_create_summaries_invalid_json(test_app: TestClient):
     response: Response = test_app.post(SUMMARIES_ENDPOINT, json={})
     assert response.status_code == 422
@@ -51,21 +201,54 @@ def test_read_summary(test_app: TestClient, monkeypatch):
         "id": 1,
         "url": "https://foo.bar",
         "summary": "summary",
+        "status": "done",
+        "error": None,
+        "created_at": datetime.utcnow().isoformat(),
+    }
+
+    async def mock_get(id, fields=crud.SUMMARY_FIELDS):
+        return test_data
+
+    monkeypatch.setattr(crud, "get", mock_get)
+
+    response: Response = test_app.get(f"{SUMMARIES_ENDPOINT}/1/")
+    assert response.status_code == 200
+    assert response.json() == test_data
+
+
+def test_read_summary_fast_json(test_app: TestClient, override_settings, monkeypatch):
+    test_data = {
+        "id": 1,
+        "url": "https://foo.bar",
+        "summary": "summary",
+        "status": "done",
+        "error": None,
         "created_at": datetime.utcnow().isoformat(),
     }
 
-    async def mock_get(id):
+    async def mock_get(id, fields=crud.SUMMARY_FIELDS):
         return test_data
 
     monkeypatch.setattr(crud, "get", mock_get)
 
+    async def mock_get_all(limit, after, **filters):
+        return [test_data]
+
+    monkeypatch.setattr(crud, "get_all", mock_get_all)
+
+    override_settings(fast_json_routes={"read_summary", "read_all_summaries"})
+
     response: Response = test_app.get(f"{SUMMARIES_ENDPOINT}/1/")
     assert response.status_code == 200
     assert response.json() == test_data
 
+    response = test_app.get(SUMMARIES_ENDPOINT)
+    assert response.status_code == 200
+    assert response.json() == {"items": [test_data], "next_cursor": None}
+
 
 def test_read_summary_incorrect_id(test_app: TestClient, monkeypatch):
-    async def mock_get(id):
+    async def mock_get(id, fields=crud.SUMMARY_FIELDS):
         return None
 
     monkeypatch.setattr(crud, "get", mock_get)
@@ -81,28 +264,39 @@ def test_read_all_summaries(test_app: TestClient, monkeypatch):
             "id": 1,
             "url": "https://foo.bar",
             "summary": "summary",
+            "status": "done",
+            "error": None,
             "created_at": datetime.utcnow().isoformat(),
         },
         {
             "id": 2,
             "url": "https://testdrivenn.io",
             "summary": "summary",
+            "status": "done",
+            "error": None,
             "created_at": datetime.utcnow().isoformat(),
         },
     ]
 
-    async def mock_get_all():
-        return test_data
+    async def mock_get_all(limit, after, **filters):
+        return test_data[:limit]
 
     monkeypatch.setattr(crud, "get_all", mock_get_all)
 
     response: Response = test_app.get(SUMMARIES_ENDPOINT)
     assert response.status_code == 200
-    assert response.json() == test_data
+    assert response.json() == {"items": test_data, "next_cursor": None}
+
+    response = test_app.get(f"{SUMMARIES_ENDPOINT}/?limit=1")
+    assert response.status_code == 200
+    assert response.json() == {
+        "items": test_data[:1],
+        "next_cursor": summaries.encode_cursor(1),
+    }
 
 
 def test_remove_summary(test_app: TestClient, monkeypatch):
-    async def mock_get(id):
+    async def mock_delete(id):
         return {
             "id": 1,
             "url": "https://foo.bar",
@@ -110,11 +304,6 @@ def test_remove_summary(test_app: TestClient, monkeypatch):
             "created_at": datetime.utcnow().isoformat(),
         }
 
-    monkeypatch.setattr(crud, "get", mock_get)
-
-    async def mock_delete(id):
-        return id
-
     monkeypatch.setattr(crud, "delete", mock_delete)
 
     response: Response = test_app.delete(f"{SUMMARIES_ENDPOINT}/1/")
@@ -123,10 +312,10 @@ def test_remove_summary(test_app: TestClient, monkeypatch):
 
 
 def test_remove_summary_incorrect_id(test_app: TestClient, monkeypatch):
-    async def mock_get(id):
+    async def mock_delete(id):
         None
 
-    monkeypatch.setattr(crud, "get", mock_get)
+    monkeypatch.setattr(crud, "delete", mock_delete)
 
     response: Response = test_app.delete(f"{SUMMARIES_ENDPOINT}/999/")
     assert response.status_code == 404
@@ -139,6 +328,8 @@ def test_update_summary(test_app: TestClient, monkeypatch):
         "id": 1,
         "url": "https://foo.bar",
         "summary": "summary",
+        "status": "done",
+        "error": None,
         "created_at": datetime.utcnow().isoformat(),
     }
 
@@ -0,0 +1,240 @@
+import asyncio
+import pstats
+from concurrent.futures import ThreadPoolExecutor
+
+import nltk
+import pytest
+from newspaper import nlp
+
+from app import summarizer
+from app.config import Settings
+
+
+class MockQuerySet:
+    updates = []
+
+    def __init__(self, **filters):
+        self.filters = filters
+
+    async def update(self, **values):
+        self.updates.append((self.filters, values))
+
+
+class MockTextSummary:
+    filter = MockQuerySet
+
+
+class MockSummaryWriter:
+    def __init__(self):
+        self.writes = {}
+
+    async def write(self, summary_id, summary):
+        self.writes[summary_id] = summary
+
+
+@pytest.fixture
+def summary_writer(monkeypatch):
+    writer = MockSummaryWriter()
+    monkeypatch.setattr(summarizer, "get_summary_writer", lambda: writer)
+    return writer
+
+
+@pytest.fixture
+def executor_settings(monkeypatch):
+    def set_mode(mode):
+        settings = Settings(summarizer_executor=mode)
+        monkeypatch.setattr(summarizer, "get_settings", lambda: settings)
+        summarizer.shutdown_executors()
+
+    yield set_mode
+    summarizer.shutdown_executors()
+
+
+def test_executor_modes(executor_settings):
+    executor_settings("inline")
+    assert summarizer.get_nlp_executor() is None
+
+    executor_settings("thread")
+    assert isinstance(summarizer.get_nlp_executor(), ThreadPoolExecutor)
+    assert summarizer.get_nlp_executor() is summarizer.get_nlp_executor()
+
+    executor_settings("invalid")
+    with pytest.raises(ValueError):
+        summarizer.get_nlp_executor()
+
+
+def test_generate_summary_offloads_blocking_work(
+    executor_settings, summary_writer, monkeypatch
+):
+    executor_settings("thread")
+    monkeypatch.setattr(summarizer, "TextSummary", MockTextSummary)
+
+    async def mock_fetch(url):
+        return "<html></html>"
+
+    monkeypatch.setattr(summarizer.fetcher, "fetch", mock_fetch)
+    monkeypatch.setattr(
+        summarizer,
+        "summarize_html",
+        lambda url, html, engine: ("summary", {"nlp": 0.5}),
+    )
+
+    asyncio.run(summarizer.generate_summary(1, "https://foo.bar"))
+
+    filters, values = MockQuerySet.updates[-1]
+    assert filters == {"id": 1}
+    assert values["status"] == "running"
+    assert summary_writer.writes == {1: "summary"}
+
+    stages = {
+        labels[0]: count
+        for name, labels, _, count in summarizer.metrics.summarizer_stage_duration.samples()
+        if name.endswith("_count")
+    }
+    assert set(stages) == {"download", "nlp", "update"}
+
+
+def test_sampled_summary_profiles_executor_work(
+    executor_settings, summary_writer, monkeypatch, tmp_path
+):
+    executor_settings("thread")
+    settings = summarizer.profiling.get_settings()
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profile_sample_rate", 1.0)
+    summarizer.profiling.reset_profile_ring()
+    monkeypatch.setattr(summarizer, "TextSummary", MockTextSummary)
+
+    async def mock_fetch(url):
+        return "<html></html>"
+
+    def mock_summarize_html(url, html, engine):
+        return "summary", {"nlp": 0.5}
+
+    monkeypatch.setattr(summarizer.fetcher, "fetch", mock_fetch)
+    monkeypatch.setattr(summarizer, "summarize_html", mock_summarize_html)
+
+    try:
+        asyncio.run(summarizer.generate_summary(1, "https://foo.bar"))
+    finally:
+        summarizer.profiling.reset_profile_ring()
+
+    assert summary_writer.writes == {1: "summary"}
+    dumps = {path.name.split("-", 2)[2]: path for path in tmp_path.glob("*.prof")}
+    assert set(dumps) == {"summary_1.prof", "summary_1_nlp.prof"}
+    stats = pstats.Stats(str(dumps["summary_1_nlp.prof"]))
+    assert any(func == "mock_summarize_html" for _, _, func in stats.stats)
+
+
+def test_warmup_fails_fast_without_punkt(monkeypatch):
+    def mock_find(resource):
+        raise LookupError(resource)
+
+    def mock_download(*args, **kwargs):
+        raise AssertionError("warmup must not download at runtime")
+
+    monkeypatch.setattr(nltk.data, "find", mock_find)
+    monkeypatch.setattr(nltk, "download", mock_download)
+
+    with pytest.raises(RuntimeError):
+        summarizer.warmup()
+
+
+def test_warmup_loads_resources(monkeypatch):
+    loaded = []
+    monkeypatch.setattr(nltk.data, "find", lambda resource: resource)
+    monkeypatch.setattr(nltk.data, "load", loaded.append)
+
+    summarizer.warmup()
+
+    assert loaded == [summarizer.PUNKT_RESOURCE]
+    assert nlp.stopwords
+
+
+@pytest.mark.parametrize(
+    "final, status, published",
+    [(True, "failed", [(1, "failed")]), (False, "pending", [])],
+)
+def test_generate_summary_records_failure(
+    executor_settings, monkeypatch, final, status, published
+):
+    executor_settings("inline")
+    monkeypatch.setattr(summarizer, "TextSummary", MockTextSummary)
+
+    async def mock_fetch(url):
+        raise summarizer.fetcher.FetchError("too large")
+
+    notified = []
+
+    async def mock_publish(summary_id, status):
+        notified.append((summary_id, status))
+
+    monkeypatch.setattr(summarizer.fetcher, "fetch", mock_fetch)
+    monkeypatch.setattr(summarizer.notifier, "publish", mock_publish)
+
+    with pytest.raises(summarizer.fetcher.FetchError):
+        asyncio.run(summarizer.generate_summary(1, "https://foo.bar", final=final))
+
+    _, values = MockQuerySet.updates[-1]
+    assert values["status"] == status
+    assert "too large" in values["error"]
+    assert notified == published
+
+
+def test_generate_summaries_batches_pages(
+    executor_settings, summary_writer, monkeypatch
+):
+    executor_settings("inline")
+    monkeypatch.setattr(summarizer.get_settings(), "summarizer_workers", 2)
+    monkeypatch.setattr(summarizer, "TextSummary", MockTextSummary)
+    MockQuerySet.updates.clear()
+
+    async def mock_fetch(url):
+        if url.endswith("broken"):
+            raise summarizer.fetcher.FetchError(url)
+        return url
+
+    batches = []
+
+    def mock_summarize_html_many(pages, engine):
+        batches.append([url for url, _ in pages])
+        return [(html.upper(), {"nlp": 0.1}) for _, html in pages]
+
+    monkeypatch.setattr(summarizer.fetcher, "fetch", mock_fetch)
+    monkeypatch.setattr(summarizer, "summarize_html_many", mock_summarize_html_many)
+
+    items = [(1, "a"), (2, "b"), (3, "broken"), (4, "c")]
+    asyncio.run(summarizer.generate_summaries(items))
+
+    assert batches == [["a", "b"], ["c"]]
+    assert summary_writer.writes == {1: "A", 2: "B", 4: "C"}
+    final = {filters["id"]: values for filters, values in MockQuerySet.updates}
+    assert final[3]["status"] == "failed"
+
+
+def test_generate_summaries_bounds_in_flight(
+    executor_settings, summary_writer, monkeypatch
+):
+    executor_settings("inline")
+    monkeypatch.setattr(summarizer, "TextSummary", MockTextSummary)
+    downloading, peak = 0, 0
+
+    async def mock_fetch(url):
+        nonlocal downloading, peak
+        downloading += 1
+        peak = max(peak, downloading)
+        await asyncio.sleep(0)
+        downloading -= 1
+        return url
+
+    monkeypatch.setattr(summarizer.fetcher, "fetch", mock_fetch)
+    monkeypatch.setattr(
+        summarizer,
+        "summarize_html_many",
+        lambda pages, engine: [(html, {}) for _, html in pages],
+    )
+
+    items = [(i, f"page {i}") for i in range(1, 8)]
+    asyncio.run(summarizer.generate_summaries(items, max_in_flight=3))
+
+    assert peak == 3
+    assert summary_writer.writes == dict(items)
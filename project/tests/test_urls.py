@@ -0,0 +1,25 @@
+import pytest
+
+from app.urls import canonicalize_url, url_hash
+
+
+@pytest.mark.parametrize(
+    "url, canonical",
+    [
+        ["https://foo.bar", "https://foo.bar"],
+        ["HTTPS://Foo.Bar/", "https://foo.bar"],
+        ["https://foo.bar:443/a/b/", "https://foo.bar/a/b"],
+        ["http://foo.bar:8080/a", "http://foo.bar:8080/a"],
+        ["https://foo.bar/a?b=2&a=1", "https://foo.bar/a?a=1&b=2"],
+        ["https://foo.bar/a?utm_source=x&id=1&fbclid=y", "https://foo.bar/a?id=1"],
+        ["https://foo.bar/a#section", "https://foo.bar/a"],
+    ],
+)
+def test_canonicalize_url(url, canonical):
+    assert canonicalize_url(url) == canonical
+
+
+def test_url_hash():
+    assert url_hash("https://Foo.bar/?utm_medium=email") == url_hash("https://foo.bar")
+    assert url_hash("https://foo.bar/a") != url_hash("https://foo.bar/b")
+    assert len(url_hash("https://foo.bar")) == 64
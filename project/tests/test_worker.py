@@ -0,0 +1,69 @@
+import asyncio
+
+from app import worker
+
+
+class MockJob:
+    id = 1
+    summary_id = 1
+    url = "https://foo.bar"
+    attempts = 1
+    max_attempts = 3
+
+
+def test_work_survives_database_errors(monkeypatch):
+    monkeypatch.setattr(worker.get_settings(), "job_poll_interval", 0.001)
+    stop = asyncio.Event()
+    calls = []
+    completed = []
+
+    async def mock_claim():
+        calls.append("claim")
+        if len(calls) == 1:
+            raise ConnectionError("database is gone")
+        if len(calls) == 2:
+            return MockJob()
+        stop.set()
+        return None
+
+    async def mock_generate_summary(summary_id, url, final=False):
+        pass
+
+    async def mock_complete(job):
+        completed.append(job.id)
+
+    monkeypatch.setattr(worker.jobs, "claim", mock_claim)
+    monkeypatch.setattr(worker.jobs, "complete", mock_complete)
+    monkeypatch.setattr(worker, "generate_summary", mock_generate_summary)
+
+    asyncio.run(asyncio.wait_for(worker.work(0, stop), timeout=1))
+
+    assert len(calls) == 3
+    assert completed == [1]
+
+
+def test_work_survives_failed_settle(monkeypatch):
+    monkeypatch.setattr(worker.get_settings(), "job_poll_interval", 0.001)
+    stop = asyncio.Event()
+    claimed = []
+
+    async def mock_claim():
+        claimed.append(1)
+        if len(claimed) > 1:
+            stop.set()
+            return None
+        return MockJob()
+
+    async def mock_generate_summary(summary_id, url, final=False):
+        raise ValueError("boom")
+
+    async def mock_fail(job, error):
+        raise ConnectionError("database is gone")
+
+    monkeypatch.setattr(worker.jobs, "claim", mock_claim)
+    monkeypatch.setattr(worker.jobs, "fail", mock_fail)
+    monkeypatch.setattr(worker, "generate_summary", mock_generate_summary)
+
+    asyncio.run(asyncio.wait_for(worker.work(0, stop), timeout=1))
+
+    assert len(claimed) == 2
@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+from tortoise import connections
+
+from app import metrics, writer
+from app.models.tortoise import SummaryStatus, TextSummary
+
+
+class MockSummaryCache:
+    def __init__(self):
+        self.invalidated = []
+
+    async def invalidate(self, id):
+        self.invalidated.append(id)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = MockSummaryCache()
+    monkeypatch.setattr(writer, "get_summary_cache", lambda: cache)
+    return cache
+
+
+def record_queries() -> list[str]:
+    """Record the SQL sent through the default connection."""
+    connection = connections.get("default")
+    execute_query = connection.execute_query
+    queries = []
+
+    async def recording_execute_query(query, values=None):
+        queries.append(query)
+        return await execute_query(query, values)
+
+    connection.execute_query = recording_execute_query
+    return queries
+
+
+async def create_summaries(count: int) -> list[int]:
+    summaries = [
+        await TextSummary.create(url=f"https://foo.bar/{i}", summary="")
+        for i in range(count)
+    ]
+    return [summary.id for summary in summaries]
+
+
+def histogram_count(histogram) -> int:
+    return sum(
+        count for name, _, _, count in histogram.samples() if name.endswith("_count")
+    )
+
+
+def test_concurrent_writes_share_one_update(cache, run_with_db):
+    async def scenario():
+        ids = await create_summaries(3)
+        queries = record_queries()
+        summary_writer = writer.SummaryWriter(window=0.05, max_items=100)
+
+        await asyncio.gather(*(summary_writer.write(id, f"summary {id}") for id in ids))
+
+        updates = [query for query in queries if query.startswith("UPDATE")]
+        assert len(updates) == 1
+        assert "FROM (VALUES (?, ?), (?, ?), (?, ?))" in updates[0]
+        for id in ids:
+            summary = await TextSummary.get(id=id)
+            assert summary.summary == f"summary {id}"
+            assert summary.status == SummaryStatus.DONE
+            assert summary.version == 2
+        assert sorted(cache.invalidated) == ids
+
+    run_with_db(scenario)
+
+
+def test_max_items_flushes_immediately(cache, run_with_db):
+    async def scenario():
+        ids = await create_summaries(2)
+        queries = record_queries()
+        summary_writer = writer.SummaryWriter(window=60, max_items=2)
+
+        await asyncio.wait_for(
+            asyncio.gather(*(summary_writer.write(id, "summary") for id in ids)),
+            timeout=1,
+        )
+
+        assert len([query for query in queries if query.startswith("UPDATE")]) == 1
+
+    run_with_db(scenario)
+
+
+def test_close_flushes_buffer(cache, run_with_db):
+    async def scenario():
+        [id] = await create_summaries(1)
+        summary_writer = writer.SummaryWriter(window=60, max_items=100)
+
+        write = asyncio.create_task(summary_writer.write(id, "summary"))
+        await asyncio.sleep(0)
+        assert not write.done()
+
+        await summary_writer.close()
+        await asyncio.wait_for(write, timeout=1)
+        assert (await TextSummary.get(id=id)).summary == "summary"
+        assert cache.invalidated == [id]
+
+    run_with_db(scenario)
+
+
+def test_failed_flush_fails_every_waiter(cache, run_with_db):
+    async def scenario():
+        ids = await create_summaries(2)
+        summary_writer = writer.SummaryWriter(window=0.01, max_items=100)
+        connection = connections.get("default")
+
+        async def broken_execute_query(query, values=None):
+            raise RuntimeError("database is gone")
+
+        connection.execute_query = broken_execute_query
+        results = await asyncio.gather(
+            *(summary_writer.write(id, "summary") for id in ids),
+            return_exceptions=True,
+        )
+
+        assert [str(result) for result in results] == ["database is gone"] * 2
+        assert cache.invalidated == []
+
+    run_with_db(scenario)
+
+
+def test_flush_observes_metrics(cache, run_with_db):
+    metrics.summary_write_batch_size.clear()
+    metrics.summary_write_flush_duration.clear()
+
+    async def scenario():
+        ids = await create_summaries(3)
+        summary_writer = writer.SummaryWriter(window=0.01, max_items=100)
+        await asyncio.gather(*(summary_writer.write(id, "summary") for id in ids))
+
+    run_with_db(scenario)
+
+    samples = {
+        name: value for name, _, _, value in metrics.summary_write_batch_size.samples()
+    }
+    assert samples["summary_write_batch_size_sum"] == 3
+    assert samples["summary_write_batch_size_count"] == 1
+    assert histogram_count(metrics.summary_write_flush_duration) == 1